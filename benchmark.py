@@ -0,0 +1,362 @@
+"""Offline load test for the commission bot's command handlers.
+
+Drives the real commands in discord_bot.py through the bot's own
+invoke_application_command (rate limiter, metrics, correlation context)
+with fake interaction contexts against a local stand-in for the Flask
+commission API, then reports latency percentiles, throughput and
+event-loop lag.
+
+    python benchmark.py --concurrency 50 --requests 5000 --latency 0.02 --error-rate 0.01
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from types import SimpleNamespace
+
+from aiohttp import web
+
+COMMANDS = ('mycommissions', 'commission', 'mystats', 'leaderboard', 'complete', 'report', 'match',
+            '!commission', '!accept')
+COMMISSION_TYPES = ('Merc for Hire', 'Merc Team for Hire', 'Task for a Merc Team')
+SKILLS = ('Python', 'Web Development', 'API Integration', 'Rust', 'Go', 'JavaScript', 'SQL', 'Docker',
+          'Machine Learning', 'Unity', 'Blender', 'DevOps', 'React', 'C++', 'Security')
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='command invocations to measure')
+    parser.add_argument('--warmup', type=int, default=100, help='invocations run before measuring')
+    parser.add_argument('--concurrency', type=int, default=20, help='invocations in flight at once')
+    parser.add_argument('--commands', default=','.join(COMMANDS), help='comma-separated commands to mix')
+    parser.add_argument('--users', type=int, default=500, help='distinct invoking users')
+    parser.add_argument('--commissions', type=int, default=2000, help='commissions known to the stub')
+    parser.add_argument('--latency', type=float, default=0.02, help='mean stub response latency in seconds')
+    parser.add_argument('--jitter', type=float, default=0.5, help='latency jitter as a fraction of the mean')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='fraction of stub responses that are 503s')
+    parser.add_argument('--no-cache', action='store_true', help='disable the response cache')
+    parser.add_argument('--no-rate-limit', action='store_true', help="disable the bot's command rate limits")
+    parser.add_argument('--port', type=int, default=18765, help='port for the stub backend')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', action='store_true', help='print the report as JSON')
+    parser.add_argument('--log-level', default='CRITICAL', help="level for the bot's own logger")
+    return parser.parse_args()
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, round(fraction * len(samples)) - 1))]
+
+class StubBackend:
+    """aiohttp stand-in for the Flask commission API with latency and error injection"""
+
+    def __init__(self, args):
+        self.latency = args.latency
+        self.jitter = args.jitter
+        self.error_rate = args.error_rate
+        self.requests = defaultdict(int)
+        self.next_id = args.commissions + 1
+        self.commissions = {
+            commission_id: {
+                'id': commission_id,
+                'commission_type': random.choice(COMMISSION_TYPES),
+                'skills': ', '.join(random.sample(SKILLS, 3)),
+                'status': random.choice(('approved', 'approved', 'accepted', 'completed', 'pending')),
+                'user': {'discord_id': str(random.randrange(args.users)), 'username': 'creator'},
+                'accepter': None,
+                'created_at': '2025-01-01T00:00:00.000000',
+                'expires_at': '2030-01-01T00:00:00.000000'
+            }
+            for commission_id in range(1, args.commissions + 1)
+        }
+
+    @web.middleware
+    async def inject(self, request, handler):
+        self.requests[request.method] += 1
+        await asyncio.sleep(max(0.0, random.uniform(1 - self.jitter, 1 + self.jitter) * self.latency))
+        if random.random() < self.error_rate:
+            return web.json_response({'error': 'Injected failure'}, status=503)
+        return await handler(request)
+
+    async def root(self, request):
+        return web.json_response({'status': 'ok'})
+
+    async def user_commissions(self, request):
+        user_id = request.match_info['user_id']
+        owned = [c for c in self.commissions.values() if c['user']['discord_id'] == user_id]
+        return web.json_response({'commissions': owned})
+
+    async def commission(self, request):
+        commission = self.commissions.get(int(request.match_info['commission_id']))
+        if commission is None:
+            return web.json_response({'error': 'Commission not found'}, status=404)
+        return web.json_response({'commission': commission})
+
+    async def user_stats(self, request):
+        return web.json_response({'stats': {'total_commissions': 12, 'completed_commissions': 9,
+                                            'success_rate': 75.0, 'average_rating': 4.4,
+                                            'karma_points': 120, 'rank': 7}})
+
+    async def leaderboard(self, request):
+        return web.json_response({'leaderboard': [
+            {'username': f'merc{i}', 'display_name': None, 'karma_points': 500 - i * 10,
+             'completed_commissions': 40 - i, 'average_rating': 4.5}
+            for i in range(10)
+        ]})
+
+    async def create(self, request):
+        payload = await request.json()
+        commission_id, self.next_id = self.next_id, self.next_id + 1
+        self.commissions[commission_id] = {
+            'id': commission_id,
+            'commission_type': payload['commission_type'],
+            'skills': payload['skills'],
+            'status': 'pending',
+            'user': {'discord_id': payload['discord_id'], 'username': payload['username']},
+            'accepter': None,
+            'created_at': '2025-01-01T00:00:00.000000',
+            'expires_at': '2030-01-01T00:00:00.000000'
+        }
+        return web.json_response({'commission_id': commission_id}, status=201)
+
+    async def accept(self, request):
+        payload = await request.json()
+        commission = self.commissions.get(int(request.match_info['commission_id']))
+        if commission is None:
+            return web.json_response({'error': 'Commission not found'}, status=404)
+        commission['status'] = 'accepted'
+        commission['accepter'] = {'discord_id': payload['discord_id'], 'username': payload['username']}
+        return web.json_response({'message': 'Commission accepted'})
+
+    async def complete(self, request):
+        await request.json()
+        return web.json_response({'message': 'Commission marked as completed'})
+
+    async def report(self, request):
+        await request.json()
+        return web.json_response({'message': 'Report submitted'}, status=201)
+
+    def app(self):
+        app = web.Application(middlewares=[self.inject])
+        app.router.add_get('/', self.root)
+        app.router.add_get('/api/users/{user_id}/commissions', self.user_commissions)
+        app.router.add_get('/api/users/{user_id}/stats', self.user_stats)
+        app.router.add_get('/api/leaderboard', self.leaderboard)
+        app.router.add_get('/api/commissions/{commission_id:\\d+}', self.commission)
+        app.router.add_post('/api/commissions', self.create)
+        app.router.add_post('/api/commissions/{commission_id:\\d+}/accept', self.accept)
+        app.router.add_post('/api/commissions/{commission_id:\\d+}/complete', self.complete)
+        app.router.add_post('/api/commissions/{commission_id:\\d+}/report', self.report)
+        return app
+
+_interaction_ids = itertools.count(1)
+
+class FakeUser:
+    def __init__(self, user_id):
+        self.id = user_id
+        self.name = f'user{user_id}'
+        self.display_name = f'User {user_id}'
+        self.mention = f'<@{user_id}>'
+
+    async def send(self, *args, **kwargs):
+        pass
+
+class FakeMessage:
+    async def edit(self, **kwargs):
+        pass
+
+class FakeContext:
+    """Just enough of an ApplicationContext for invoke_application_command and the command callbacks"""
+
+    def __init__(self, bot, command, user, options):
+        self.bot = bot
+        self.command = command
+        self.user = self.author = user
+        self.interaction = SimpleNamespace(id=next(_interaction_ids), user=user, data={
+            'options': [{'name': name, 'value': value} for name, value in options.items()]
+        })
+        self.guild = self.guild_id = self.cog = None
+        self.command_failed = False
+        self.responses = []
+
+    async def defer(self, ephemeral=False):
+        pass
+
+    async def respond(self, content=None, **kwargs):
+        self.responses.append(content)
+
+    async def send(self, content=None, **kwargs):
+        self.responses.append(content)
+        return FakeMessage()
+
+    @property
+    def limited(self):
+        return any(isinstance(content, str) and content.startswith('⏳') for content in self.responses)
+
+    @property
+    def failed(self):
+        return self.command_failed or \
+            any(isinstance(content, str) and content.startswith(('❌', '⌛')) for content in self.responses)
+
+def invocation(bot_module, command, args):
+    """Return (command object, options) for one random invocation of `command`"""
+    commission_id = random.randint(1, args.commissions)
+    commands = {
+        'mycommissions': (bot_module.mycommissions_slash, {}),
+        'commission': (bot_module.commission_slash, {'commission_id': commission_id}),
+        'mystats': (bot_module.mystats_slash, {}),
+        'leaderboard': (bot_module.leaderboard_slash, {}),
+        'complete': (bot_module.complete_slash, {'commission_id': commission_id, 'documentation': 'Benchmark run'}),
+        'report': (bot_module.report_slash, {'commission_id': commission_id, 'report_type': 'positive',
+                                              'reason': 'Benchmark run'}),
+        'match': (bot_module.match_slash, {'commission_id': commission_id, 'results': 5}),
+        '!commission': (bot_module.create_commission, {'commission_type': random.choice(('merc', 'team', 'task')),
+                                                        'skills': ', '.join(random.sample(SKILLS, 3))}),
+        '!accept': (bot_module.accept_commission, {'commission_id': commission_id})
+    }
+    return commands[command]
+
+async def sample_loop_lag(lags, interval=0.01):
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lags.append(max(loop.time() - started - interval, 0.0))
+
+async def run_load(bot_module, args, total):
+    """Run `total` invocations at the configured concurrency; returns (samples, elapsed)"""
+    commands = [command.strip() for command in args.commands.split(',') if command.strip()]
+    samples = []
+    remaining = itertools.count()
+
+    async def worker():
+        while next(remaining) < total:
+            command = random.choice(commands)
+            command_object, options = invocation(bot_module, command, args)
+            ctx = FakeContext(bot_module.bot, command_object, FakeUser(random.randrange(args.users)), options)
+            started = time.perf_counter()
+            try:
+                await bot_module.bot.invoke_application_command(ctx)
+                failed = ctx.failed
+            except Exception:
+                failed = True
+            samples.append((command, time.perf_counter() - started, failed, ctx.limited))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    return samples, time.perf_counter() - started
+
+def summarize(samples, elapsed):
+    latencies = sorted(latency for _, latency, _, _ in samples)
+    return {
+        'requests': len(samples),
+        'errors': sum(1 for _, _, failed, _ in samples if failed),
+        'rate_limited': sum(1 for _, _, _, limited in samples if limited),
+        'throughput_rps': round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+        'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0
+    }
+
+def print_report(report):
+    print(f"concurrency {report['concurrency']} · stub latency {report['stub_latency_ms']} ms · "
+          f"error rate {report['stub_error_rate']:.1%} · cache {'off' if report['cache_disabled'] else 'on'} · "
+          f"rate limits {'off' if report['rate_limit_disabled'] else 'on'}")
+    header = (f"{'command':<14}{'requests':>9}{'errors':>8}{'limited':>9}{'req/s':>10}"
+              f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    print(header)
+    print('-' * len(header))
+    for name, row in [*sorted(report['commands'].items()), ('total', report['total'])]:
+        print(f"{name:<14}{row['requests']:>9}{row['errors']:>8}{row['rate_limited']:>9}{row['throughput_rps']:>10}"
+              f"{row['p50_ms']:>9}{row['p95_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}")
+    lag = report['loop_lag_ms']
+    print(f"event loop lag: p50 {lag['p50']} ms · p99 {lag['p99']} ms · max {lag['max']} ms")
+    backend = report['backend']
+    print(f"backend: {backend['stub_requests']} stub requests · cache hits {backend['cache_hits']} · "
+          f"misses {backend['cache_misses']} · coalesced {backend['coalesced']}")
+
+async def main(args):
+    random.seed(args.seed)
+    stub = StubBackend(args)
+    runner = web.AppRunner(stub.app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '127.0.0.1', args.port).start()
+
+    import discord_bot
+    logging.getLogger('commission_bot').setLevel(args.log_level.upper())
+    if args.no_cache:
+        for key in discord_bot.CACHE_TTLS:
+            discord_bot.CACHE_TTLS[key] = None
+    if args.no_rate_limit:
+        unlimited = (1e9, 1e9)
+        discord_bot.rate_limiter = discord_bot.RateLimiter(user_limit=unlimited, guild_limit=unlimited,
+                                                           command_limits={})
+    # Handler errors are counted per sample; a listener also stops py-cord printing each traceback
+    async def ignore_command_error(ctx, exception):
+        pass
+    discord_bot.bot.add_listener(ignore_command_error, 'on_application_command_error')
+    # /match needs the open commissions indexed, as the bot would after its startup load
+    for commission in stub.commissions.values():
+        discord_bot.skill_index.update(commission)
+
+    lags = []
+    lag_task = asyncio.create_task(sample_loop_lag(lags))
+    try:
+        await run_load(discord_bot, args, args.warmup)
+        stub.requests.clear()
+        hits, misses = discord_bot.backend.cache.hits, discord_bot.backend.cache.misses
+        coalesced = discord_bot.backend.coalesced
+        del lags[:]
+        samples, elapsed = await run_load(discord_bot, args, args.requests)
+    finally:
+        lag_task.cancel()
+        await discord_bot.backend.close()
+        await runner.cleanup()
+
+    by_command = defaultdict(list)
+    for sample in samples:
+        by_command[sample[0]].append(sample)
+    lags.sort()
+    return {
+        'concurrency': args.concurrency,
+        'stub_latency_ms': args.latency * 1000,
+        'stub_error_rate': args.error_rate,
+        'cache_disabled': args.no_cache,
+        'rate_limit_disabled': args.no_rate_limit,
+        'elapsed_s': round(elapsed, 3),
+        'total': summarize(samples, elapsed),
+        'commands': {command: summarize(rows, elapsed) for command, rows in by_command.items()},
+        'loop_lag_ms': {'p50': round(percentile(lags, 0.50) * 1000, 2), 'p99': round(percentile(lags, 0.99) * 1000, 2),
+                        'max': round(lags[-1] * 1000, 2) if lags else 0.0},
+        'backend': {'stub_requests': sum(stub.requests.values()),
+                    'cache_hits': discord_bot.backend.cache.hits - hits,
+                    'cache_misses': discord_bot.backend.cache.misses - misses,
+                    'coalesced': discord_bot.backend.coalesced - coalesced}
+    }
+
+if __name__ == '__main__':
+    args = parse_args()
+    unknown = set(command.strip() for command in args.commands.split(',')) - set(COMMANDS)
+    if unknown:
+        sys.exit(f"Unknown commands: {', '.join(sorted(unknown))}")
+    # Point the bot at the stub and keep its local state out of the working tree; set before import
+    state_dir = tempfile.mkdtemp(prefix='commission-bench-')
+    os.environ.update({
+        'FLASK_SERVER_URL': f'http://127.0.0.1:{args.port}',
+        'OUTBOX_PATH': os.path.join(state_dir, 'outbox.sqlite3'),
+        'EXPIRY_DB_PATH': os.path.join(state_dir, 'deadlines.sqlite3'),
+        'COMMAND_SYNC_CACHE': ''
+    })
+    report = asyncio.run(main(args))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
@@ -1,45 +1,1418 @@
 import os
+import json
+import hmac
+import hashlib
 import discord
-import requests
+import aiohttp
+from aiohttp import web
 import asyncio
 import threading
-from datetime import datetime, timedelta
+import time
+import functools
+import math
+import heapq
+import re
+import sys
+import queue
+import copy
+import random
+import atexit
+import logging
+import logging.handlers
+import contextvars
+import signal
+import sqlite3
+import subprocess
+import concurrent.futures
+from collections import OrderedDict, defaultdict
+from fnmatch import fnmatchcase
+from urllib.parse import urlencode
+from datetime import datetime, timedelta, timezone
 from discord.ext import commands
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request
+
+# Optional faster decoders for backend responses; plain json is the fallback
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
 
 # Discord bot setup
-intents = discord.Intents.default()
-intents.message_content = True
-intents.guilds = True
+# Lean mode keeps only what the commands use: guilds with their roles, and the
+# invoking member, which arrives with every interaction
+LEAN_GATEWAY = os.environ.get("LEAN_GATEWAY", "").lower() in ('1', 'true', 'yes')
+MESSAGE_CACHE_SIZE = int(os.environ.get("MESSAGE_CACHE_SIZE", "100"))
 
-# Use discord.Bot for slash commands
-bot = discord.Bot(command_prefix='!', intents=intents)
+if LEAN_GATEWAY:
+    intents = discord.Intents.none()
+    intents.guilds = True
+    gateway_options = {
+        'member_cache_flags': discord.MemberCacheFlags.none(),
+        'chunk_guilds_at_startup': False,
+        'max_messages': MESSAGE_CACHE_SIZE or None
+    }
+else:
+    intents = discord.Intents.default()
+    intents.message_content = True
+    intents.guilds = True
+    gateway_options = {}
+
+# Sharding: SHARD_IDS/SHARD_COUNT pin this process to some shards; SHARD_WORKERS > 1
+# makes this process a supervisor that splits the shards across that many workers
+SHARD_WORKERS = int(os.environ.get("SHARD_WORKERS", "1"))
+SHARD_COUNT = int(os.environ["SHARD_COUNT"]) if os.environ.get("SHARD_COUNT") else None
+SHARD_IDS = [int(shard_id) for shard_id in os.environ.get("SHARD_IDS", "").split(',') if shard_id.strip()] or None
+SHARDED = os.environ.get("SHARDING", "").lower() in ('1', 'true', 'yes', 'auto') or SHARD_COUNT is not None
+# Every shard worker receives every backend event; only the one running shard 0 sends DMs for them
+PRIMARY_PROCESS = SHARD_IDS is None or 0 in SHARD_IDS
+# Discord allows one shard IDENTIFY per this many seconds, so the supervisor paces worker starts by it
+SHARD_IDENTIFY_INTERVAL = float(os.environ.get("SHARD_IDENTIFY_INTERVAL", "5"))
+# Cap on the doubling delay before restarting a worker that keeps exiting
+SHARD_RESTART_BACKOFF_MAX = float(os.environ.get("SHARD_RESTART_BACKOFF_MAX", "300"))
+
+if SHARDED:
+    gateway_options['shard_count'] = SHARD_COUNT
+    if SHARD_IDS is not None:
+        gateway_options['shard_ids'] = SHARD_IDS
 
 # Configuration
 FLASK_SERVER_URL = os.environ.get('FLASK_SERVER_URL', 'http://localhost:5000')
 COMMISSION_CHANNEL_ID = int(os.environ.get("COMMISSION_CHANNEL_ID", "0"))
 GUILD_ID = int(os.environ.get("GUILD_ID", "0"))
 ADMIN_ROLE_NAME = os.environ.get("ADMIN_ROLE_NAME", "Admin")
+BACKEND_POOL_SIZE = int(os.environ.get("BACKEND_POOL_SIZE", "20"))
+BACKEND_TIMEOUT = float(os.environ.get("BACKEND_TIMEOUT", "10"))
+BACKEND_CONNECT_TIMEOUT = float(os.environ.get("BACKEND_CONNECT_TIMEOUT", "3"))
+BACKEND_MAX_RETRIES = int(os.environ.get("BACKEND_MAX_RETRIES", "2"))
+BACKEND_RETRY_BASE_DELAY = float(os.environ.get("BACKEND_RETRY_BASE_DELAY", "0.25"))
+BACKEND_RETRY_MAX_DELAY = float(os.environ.get("BACKEND_RETRY_MAX_DELAY", "2"))
+# Responses that mean the backend is restarting or overloaded, not that the request was wrong
+RETRYABLE_STATUSES = {502, 503, 504}
+HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", "15"))
+HEALTH_FAILURE_THRESHOLD = int(os.environ.get("HEALTH_FAILURE_THRESHOLD", "3"))
+HEALTH_DEGRADED_LATENCY = float(os.environ.get("HEALTH_DEGRADED_LATENCY", "2"))
+CACHE_MAX_ENTRIES = int(os.environ.get("CACHE_MAX_ENTRIES", "1024"))
+PAGE_SIZE = int(os.environ.get("PAGE_SIZE", "10"))
+PAGINATOR_TIMEOUT = float(os.environ.get("PAGINATOR_TIMEOUT", "180"))
+BULK_MAX_IDS = int(os.environ.get("BULK_MAX_IDS", "500"))
+WEBHOOK_SECRET = os.environ.get("WEBHOOK_SECRET", "")
+LOG_LEVEL = os.environ.get("LOG_LEVEL", "INFO").upper()
+LOG_DEBUG_SAMPLE_RATE = float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "0.1"))
+LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+# 'async' serves the status endpoints on the bot's loop; 'flask' uses the Flask dev server thread
+WEB_SERVER_MODE = os.environ.get("WEB_SERVER_MODE", "async").lower()
+STATUS_REFRESH_INTERVAL = float(os.environ.get("STATUS_REFRESH_INTERVAL", "1"))
+# Token buckets as tokens per second and burst size
+RATE_LIMIT_USER = (float(os.environ.get("RATE_LIMIT_USER_RATE", "0.5")),
+                   float(os.environ.get("RATE_LIMIT_USER_BURST", "5")))
+RATE_LIMIT_GUILD = (float(os.environ.get("RATE_LIMIT_GUILD_RATE", "20")),
+                    float(os.environ.get("RATE_LIMIT_GUILD_BURST", "60")))
+RATE_LIMIT_MAX_BUCKETS = int(os.environ.get("RATE_LIMIT_MAX_BUCKETS", "10000"))
+DM_CLOSED_TTL = float(os.environ.get("DM_CLOSED_TTL", "3600"))
+# Concurrent senders for queued notifications; DM channel creation and sends share tight Discord buckets
+NOTIFY_CONCURRENCY = int(os.environ.get("NOTIFY_CONCURRENCY", "4"))
+NOTIFY_QUEUE_SIZE = int(os.environ.get("NOTIFY_QUEUE_SIZE", "5000"))
+# Deferred interactions stay valid for 15 minutes; give up on the backend well before that
+COMMAND_TIMEOUT = float(os.environ.get("COMMAND_TIMEOUT", "30"))
+# Hash and IDs of the last command tree registered with Discord; empty disables the skip
+COMMAND_SYNC_CACHE = os.environ.get("COMMAND_SYNC_CACHE", ".command_sync.json")
+OUTBOX_PATH = os.environ.get("OUTBOX_PATH", "outbox.sqlite3")
+OUTBOX_REPLAY_INTERVAL = float(os.environ.get("OUTBOX_REPLAY_INTERVAL", "5"))
+OUTBOX_BATCH_SIZE = int(os.environ.get("OUTBOX_BATCH_SIZE", "25"))
+# Autocomplete index: users kept, recent commissions kept per user
+COMMISSION_INDEX_USERS = int(os.environ.get("COMMISSION_INDEX_USERS", "5000"))
+COMMISSION_INDEX_PER_USER = int(os.environ.get("COMMISSION_INDEX_PER_USER", "50"))
+# Discord drops autocomplete responses after 3 seconds
+AUTOCOMPLETE_LOAD_TIMEOUT = float(os.environ.get("AUTOCOMPLETE_LOAD_TIMEOUT", "2"))
+# Paged list of approved commissions that seeds the skill index at startup; empty relies on events only
+SKILL_INDEX_SOURCE = os.environ.get("SKILL_INDEX_SOURCE", "/api/commissions/approved")
+MATCH_RESULTS = int(os.environ.get("MATCH_RESULTS", "5"))
+EXPIRY_DB_PATH = os.environ.get("EXPIRY_DB_PATH", "deadlines.sqlite3")
+# Seconds before expiry that creators and accepters get an "expiring soon" DM
+EXPIRY_REMINDER_BEFORE = float(os.environ.get("EXPIRY_REMINDER_BEFORE", "86400"))
+# Notifications are held this many seconds so nearby deadlines go out as one DM per user
+EXPIRY_BATCH_WINDOW = float(os.environ.get("EXPIRY_BATCH_WINDOW", "60"))
+
+# Startup phase -> seconds since the process started, in the order reached
+PROCESS_STARTED = time.monotonic()
+startup_phases = {}
+
+def mark_startup(phase):
+    """Record when a phase was first reached; reconnects fire the same hooks again"""
+    startup_phases.setdefault(phase, round(time.monotonic() - PROCESS_STARTED, 3))
+
+def parse_command_rate_limits(text):
+    """Parse "mystats=0.2:3,leaderboard=0.5:5" into {command: (rate, burst)}"""
+    limits = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        command, _, spec = item.partition('=')
+        rate, _, burst = spec.partition(':')
+        limits[command.strip()] = (float(rate), float(burst or 1))
+    return limits
+
+# Extra per-user limits for individual commands
+COMMAND_RATE_LIMITS = parse_command_rate_limits(
+    os.environ.get("RATE_LIMIT_COMMANDS", "mystats=0.2:3,mycommissions=0.2:3,leaderboard=0.2:3,commission=0.5:5"))
+
+# Fields each list view reads; sent as ?fields= so the backend can omit the rest
+FIELD_SETS = {
+    'user_commissions': ('id', 'commission_type', 'status', 'skills', 'created_at'),
+    'pending_commissions': ('id', 'commission_type', 'skills', 'created_at', 'user.discord_id'),
+    'pending_reports': ('id', 'commission_id', 'reporter_id', 'report_type', 'reason'),
+    'leaderboard': ('username', 'display_name', 'karma_points', 'completed_commissions', 'average_rating'),
+    'skill_index': ('id', 'commission_type', 'status', 'skills', 'expires_at', 'user.discord_id',
+                    'accepter.discord_id')
+}
+
+# Seconds a successful GET stays cached, per endpoint
+CACHE_TTLS = {
+    'leaderboard': float(os.environ.get("CACHE_TTL_LEADERBOARD", "60")),
+    'commission': float(os.environ.get("CACHE_TTL_COMMISSION", "30")),
+    'user_stats': float(os.environ.get("CACHE_TTL_USER_STATS", "60")),
+    'user_commissions': float(os.environ.get("CACHE_TTL_USER_COMMISSIONS", "30"))
+}
+
+# Logging
+log = logging.getLogger('commission_bot')
+
+# Set per command invocation; every record logged while handling it carries these
+correlation_id = contextvars.ContextVar('correlation_id', default=None)
+current_command = contextvars.ContextVar('current_command', default=None)
+# Loop time by which a deferred command's backend calls must give up, leaving it time to reply
+command_deadline = contextvars.ContextVar('command_deadline', default=None)
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; extra={'fields': {...}} adds structured fields"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.utcfromtimestamp(record.created).isoformat(timespec='milliseconds') + 'Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage()
+        }
+        for key in ('correlation_id', 'command'):
+            value = getattr(record, key, None)
+            if value is not None:
+                entry[key] = value
+        entry.update(getattr(record, 'fields', None) or {})
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class ContextFilter(logging.Filter):
+    """Attach the invocation context and sample debug records"""
+
+    def __init__(self, debug_sample_rate=LOG_DEBUG_SAMPLE_RATE):
+        super().__init__()
+        self.debug_sample_rate = debug_sample_rate
+
+    def filter(self, record):
+        if record.levelno <= logging.DEBUG and random.random() >= self.debug_sample_rate:
+            return False
+        record.correlation_id = correlation_id.get()
+        record.command = current_command.get()
+        return True
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that drops records instead of blocking when the queue is full"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Merge args now but leave the traceback out of the message so it stays a separate field
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+def setup_logging(level=LOG_LEVEL):
+    """Route all logging through a bounded queue drained by a writer thread"""
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    log_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+    queue_handler = DroppingQueueHandler(log_queue)
+    queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(level)
+
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    listener.start()
+    atexit.register(listener.stop)
+    return queue_handler
+
+# Metrics
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0.5"))
+
+def _format_labels(labelnames, values):
+    if not labelnames:
+        return ''
+    pairs = []
+    for name, value in zip(labelnames, values):
+        value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{value}"')
+    return '{' + ','.join(pairs) + '}'
+
+class Counter:
+    """Monotonic counter with optional labels, rendered in Prometheus text format"""
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values = defaultdict(float)
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] += amount
+
+    def collect(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} counter'
+        for labels, value in list(self._values.items()):
+            yield f'{self.name}{_format_labels(self.labelnames, labels)} {value}'
+
+class Histogram:
+    """Cumulative-bucket histogram with optional labels"""
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values = {}
+
+    def observe(self, value, *labels):
+        series = self._values.get(labels)
+        if series is None:
+            series = self._values[labels] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def collect(self):
+        yield f'# HELP {self.name} {self.documentation}'
+        yield f'# TYPE {self.name} histogram'
+        for labels, series in list(self._values.items()):
+            series = list(series)
+            for bound, count in zip(self.buckets + ('+Inf',), series):
+                bucket_labels = _format_labels(self.labelnames + ('le',), labels + (bound,))
+                yield f'{self.name}_bucket{bucket_labels} {count}'
+            label_text = _format_labels(self.labelnames, labels)
+            yield f'{self.name}_count{label_text} {series[-2]}'
+            yield f'{self.name}_sum{label_text} {series[-1]}'
+
+def _sample(name, documentation, value, kind='gauge'):
+    yield f'# HELP {name} {documentation}'
+    yield f'# TYPE {name} {kind}'
+    yield f'{name} {value}'
+
+class Metrics:
+    """Process-wide metrics exposed on /metrics"""
+
+    def __init__(self):
+        self.command_invocations = Counter(
+            'bot_command_invocations_total', 'Application commands invoked', ('command',))
+        self.command_errors = Counter(
+            'bot_command_errors_total', 'Application commands that failed, by cause', ('command', 'cause'))
+        self.command_latency = Histogram(
+            'bot_command_latency_seconds', 'Application command handler latency', ('command',))
+        self.backend_latency = Histogram(
+            'bot_backend_request_latency_seconds', 'Commission API request latency',
+            ('method', 'endpoint', 'status'))
+        self.backend_response_bytes = Counter(
+            'bot_backend_response_bytes_total', 'Commission API response body bytes', ('endpoint', 'encoding'))
+        self.backend_retries = Counter(
+            'bot_backend_retries_total', 'Commission API requests retried after a transient failure',
+            ('method', 'endpoint'))
+        self.command_timeouts = Counter(
+            'bot_command_timeouts_total', 'Deferred commands cancelled after COMMAND_TIMEOUT', ('command',))
+        self.loop_lag = Histogram(
+            'bot_event_loop_lag_seconds', 'Delay of the event loop in waking a sleeping task')
+        self.last_loop_lag = 0.0
+
+    async def monitor_loop_lag(self, interval=LOOP_LAG_INTERVAL):
+        """Measure how late the event loop wakes a task that sleeps `interval` seconds"""
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            self.last_loop_lag = max(loop.time() - started - interval, 0.0)
+            self.loop_lag.observe(self.last_loop_lag)
+
+    @staticmethod
+    def endpoint_label(path):
+        """Collapse IDs so every commission or user shares one endpoint label"""
+        return re.sub(r'/\d+(?=/|$)', '/{id}', path)
+
+metrics = Metrics()
+
+class BackendUnavailable(Exception):
+    """Raised without contacting the backend while the circuit is open"""
+
+class BackendHealth:
+    """Shared up/degraded/down state of the commission API.
+
+    Acts as a circuit breaker: after HEALTH_FAILURE_THRESHOLD consecutive
+    failures the state becomes down and commands fail fast until the
+    background probe sees the backend answer again.
+    """
+
+    UP = 'up'
+    DEGRADED = 'degraded'
+    DOWN = 'down'
+
+    def __init__(self, failure_threshold=HEALTH_FAILURE_THRESHOLD, degraded_latency=HEALTH_DEGRADED_LATENCY):
+        self.failure_threshold = failure_threshold
+        self.degraded_latency = degraded_latency
+        self.state = self.UP
+        self.consecutive_failures = 0
+        self.last_latency = None
+        self.last_error = None
+        self.last_check = None
+
+    @property
+    def is_open(self):
+        return self.state == self.DOWN
+
+    def record_success(self, latency):
+        self.consecutive_failures = 0
+        self.last_latency = latency
+        self.last_error = None
+        self.state = self.DEGRADED if latency > self.degraded_latency else self.UP
+
+    def record_failure(self, error):
+        self.consecutive_failures += 1
+        self.last_error = error
+        if self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.DOWN:
+                log.warning("Commission backend marked down", extra={'fields': {'error': error}})
+            self.state = self.DOWN
+        else:
+            self.state = self.DEGRADED
+
+    async def probe(self, client):
+        """Check the backend root endpoint once and update the state"""
+        started = time.monotonic()
+        try:
+            response = await client.request('GET', '/', probe=True)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            self.record_failure(str(e) or type(e).__name__)
+        else:
+            if response.status_code == 200:
+                self.record_success(time.monotonic() - started)
+            else:
+                self.record_failure(f"status {response.status_code}")
+        self.last_check = datetime.utcnow()
+        log.debug("Backend probe", extra={'fields': {'state': self.state, 'latency': self.last_latency}})
+
+    async def run(self, client, interval=HEALTH_CHECK_INTERVAL):
+        """Probe the backend forever, every `interval` seconds"""
+        while True:
+            await self.probe(client)
+            await asyncio.sleep(interval)
+
+    def snapshot(self):
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_latency_ms": round(self.last_latency * 1000, 1) if self.last_latency is not None else None,
+            "last_error": self.last_error,
+            "last_check": self.last_check.isoformat() if self.last_check else None
+        }
+
+# Encodings offered to the backend, best first
+ACCEPT_HEADER = 'application/msgpack, application/json;q=0.9' if msgpack else 'application/json'
+
+class BackendResponse:
+    """Fully read response from the commission API"""
+
+    def __init__(self, status_code, body, content_type='application/json'):
+        self.status_code = status_code
+        self.body = body
+        self.content_type = content_type
+        self._data = None
+
+    @property
+    def text(self):
+        return self.body.decode('utf-8', 'replace') if isinstance(self.body, bytes) else self.body
+
+    def json(self):
+        # Parsed once; cached responses are shared between commands and must not be mutated
+        if self._data is None:
+            if self.content_type in ('application/msgpack', 'application/x-msgpack') and msgpack:
+                self._data = msgpack.unpackb(self.body)
+            elif orjson:
+                # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers' handling is unchanged
+                self._data = orjson.loads(self.body)
+            else:
+                self._data = json.loads(self.body)
+        return self._data
+
+class ResponseCache:
+    """Size-bounded LRU cache of backend responses with a TTL per entry"""
+
+    def __init__(self, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def make_key(path, params=None):
+        return f'{path}?{urlencode(sorted(params.items()))}' if params else path
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def set(self, key, value, ttl):
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, *patterns):
+        """Drop every entry whose key matches one of the glob patterns"""
+        stale = [key for key in self._entries if any(fnmatchcase(key, p) for p in patterns)]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations
+        }
+
+class BackendClient:
+    """Shared async HTTP client for the commission API.
+
+    One aiohttp session with a keep-alive connection pool is created lazily on
+    the bot's event loop and reused by every command.
+    """
+
+    def __init__(self, base_url, pool_size=BACKEND_POOL_SIZE, timeout=BACKEND_TIMEOUT,
+                 connect_timeout=BACKEND_CONNECT_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+        self.health = BackendHealth()
+        self.cache = ResponseCache()
+        self.coalesced = 0
+        self._inflight = {}
+        self._session = None
+
+    def _get_session(self):
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=30)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout, connect=self.connect_timeout),
+                headers={'Accept': ACCEPT_HEADER}
+            )
+        return self._session
+
+    async def request(self, method, path, *, json=None, params=None, timeout=None, headers=None, probe=False,
+                      record_failure=True):
+        """Send a request and return a BackendResponse.
+
+        Raises BackendUnavailable while the circuit is open,
+        aiohttp.ClientConnectionError when the backend is unreachable and
+        asyncio.TimeoutError when the call exceeds its timeout. With
+        `record_failure` off the caller reports failures to the breaker itself.
+        """
+        if self.health.is_open and not probe:
+            raise BackendUnavailable("Commission system is currently offline")
+        kwargs = {}
+        if timeout is not None:
+            kwargs['timeout'] = aiohttp.ClientTimeout(total=timeout, connect=self.connect_timeout)
+        started = time.perf_counter()
+        try:
+            async with self._get_session().request(method, f'{self.base_url}{path}', json=json,
+                                                   params=params, headers=headers, **kwargs) as response:
+                body = await response.read()
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            status = 'timeout' if isinstance(e, asyncio.TimeoutError) else 'error'
+            metrics.backend_latency.observe(time.perf_counter() - started, method,
+                                            Metrics.endpoint_label(path), status)
+            if not probe and record_failure:
+                self.health.record_failure(str(e) or type(e).__name__)
+            raise
+        metrics.backend_latency.observe(time.perf_counter() - started, method,
+                                        Metrics.endpoint_label(path), response.status)
+        metrics.backend_response_bytes.inc(Metrics.endpoint_label(path), response.content_type, amount=len(body))
+        if not probe and self.health.consecutive_failures:
+            # A real answer closes the gap early; latency is left to the probe
+            self.health.consecutive_failures = 0
+        return BackendResponse(response.status, body, response.content_type)
+
+    async def get(self, path, *, cache_ttl=None, fields=None, **kwargs):
+        """GET `path`; with `cache_ttl` a 200 response is cached for that many seconds.
+
+        `fields` asks the backend to return only those (dotted, for nested)
+        fields; backends that ignore it return whole objects. Concurrent GETs
+        for the same path and params share one in-flight request.
+        """
+        if fields:
+            kwargs['params'] = {**(kwargs.get('params') or {}), 'fields': ','.join(fields)}
+        key = ResponseCache.make_key(path, kwargs.get('params'))
+        if cache_ttl is not None:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+        response = await self._single_flight(key, path, kwargs)
+        if cache_ttl is not None and response.status_code == 200:
+            self.cache.set(key, response, cache_ttl)
+        return response
+
+    async def _single_flight(self, key, path, kwargs):
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self.request('GET', path, **kwargs))
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finish_flight(key, t))
+        else:
+            self.coalesced += 1
+        # Shielded so one waiter giving up does not cancel the request for the others
+        return await asyncio.shield(task)
+
+    def _finish_flight(self, key, task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter was cancelled
+            task.exception()
+
+    async def post(self, path, *, idempotency_key=None, **kwargs):
+        """POST `path`; with an `idempotency_key` transient failures are retried.
+
+        The key is sent as the Idempotency-Key header on every attempt so the
+        backend can deduplicate a request that reached it before failing.
+        Retries use exponential backoff with full jitter and stop as soon as
+        the circuit opens or the running command's deadline would be missed,
+        so the caller still has time to queue the mutation. The breaker
+        counts one failure per logical request, not one per attempt.
+        """
+        if idempotency_key is None:
+            return await self.request('POST', path, **kwargs)
+
+        kwargs['headers'] = {**(kwargs.get('headers') or {}), 'Idempotency-Key': idempotency_key}
+        deadline = command_deadline.get()
+        attempt_timeout = kwargs.get('timeout') or self.timeout
+        loop = asyncio.get_running_loop()
+        error = None
+        for attempt in range(BACKEND_MAX_RETRIES + 1):
+            last_attempt = attempt == BACKEND_MAX_RETRIES
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    if error is not None:
+                        self.health.record_failure(error)
+                    raise asyncio.TimeoutError("Command deadline reached")
+                kwargs['timeout'] = min(attempt_timeout, remaining)
+                last_attempt = last_attempt or remaining <= attempt_timeout
+            try:
+                response = await self.request('POST', path, record_failure=False, **kwargs)
+                if response.status_code not in RETRYABLE_STATUSES or last_attempt:
+                    return response
+                error = None
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                error = str(e) or type(e).__name__
+                if last_attempt:
+                    self.health.record_failure(error)
+                    raise
+            metrics.backend_retries.inc('POST', Metrics.endpoint_label(path))
+            await asyncio.sleep(random.uniform(0, min(BACKEND_RETRY_MAX_DELAY,
+                                                      BACKEND_RETRY_BASE_DELAY * 2 ** attempt)))
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+backend = BackendClient(FLASK_SERVER_URL)
+
+def idempotency_key(ctx, action):
+    """Key for one logical request, stable across retries of the same interaction"""
+    source = getattr(ctx, 'interaction', None) or getattr(ctx, 'message', None)
+    return f'{action}:{source.id}'
+
+def invalidate_commission(commission_id):
+    """Drop cached reads that a change to one commission makes stale"""
+    backend.cache.invalidate(f'/api/commissions/{commission_id}', f'/api/commissions/{commission_id}[?]*',
+                             '/api/commissions/pending*',
+                             '/api/users/*/commissions*')
+
+def invalidate_karma():
+    """Drop cached reads derived from karma and completion counts"""
+    backend.cache.invalidate('/api/leaderboard*', '/api/users/*/stats*')
+
+class TokenBucket:
+    """Refills `rate` tokens per second up to `capacity`"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def retry_after(self):
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+class RateLimiter:
+    """Per-user, per-guild and per-user-per-command token buckets"""
+
+    def __init__(self, user_limit=RATE_LIMIT_USER, guild_limit=RATE_LIMIT_GUILD,
+                 command_limits=COMMAND_RATE_LIMITS, max_buckets=RATE_LIMIT_MAX_BUCKETS):
+        self.user_limit = user_limit
+        self.guild_limit = guild_limit
+        self.command_limits = command_limits
+        self.max_buckets = max_buckets
+        self.rejected = Counter('bot_rate_limited_total', 'Commands rejected by a rate limit',
+                                ('scope', 'command'))
+        # Least recently used buckets are dropped first; a dropped bucket comes back full
+        self._buckets = OrderedDict()
+
+    def _bucket(self, key, limit):
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = TokenBucket(*limit)
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+
+    def check(self, user_id, guild_id, command):
+        """Take one token from every applicable bucket, or none if any is empty.
+
+        Returns 0 when the call may proceed, otherwise the seconds to wait.
+        """
+        scopes = [('user', ('user', user_id), self.user_limit)]
+        if guild_id is not None:
+            scopes.append(('guild', ('guild', guild_id), self.guild_limit))
+        if command in self.command_limits:
+            scopes.append(('command', ('command', user_id, command), self.command_limits[command]))
+
+        now = time.monotonic()
+        buckets = []
+        for scope, key, limit in scopes:
+            bucket = self._bucket(key, limit)
+            bucket.refill(now)
+            wait = bucket.retry_after()
+            if wait:
+                self.rejected.inc(scope, command)
+                return wait
+            buckets.append(bucket)
+        for bucket in buckets:
+            bucket.tokens -= 1
+        return 0
+
+rate_limiter = RateLimiter()
+
+class NotificationDispatcher:
+    """Sends DMs, remembering recipients whose DMs are closed, and drains queued notifications"""
+
+    def __init__(self, closed_ttl=DM_CLOSED_TTL, concurrency=NOTIFY_CONCURRENCY, queue_size=NOTIFY_QUEUE_SIZE):
+        self.closed_ttl = closed_ttl
+        self.concurrency = concurrency
+        self.results = Counter('bot_notifications_total', 'Direct messages by outcome', ('result',))
+        self._closed = {}
+        self._queue = asyncio.Queue(maxsize=queue_size)
+
+    def dms_closed(self, user_id):
+        expires = self._closed.get(user_id)
+        if expires is None:
+            return False
+        if expires < time.monotonic():
+            del self._closed[user_id]
+            return False
+        return True
+
+    async def send_dm(self, user, **kwargs):
+        """DM `user`; returns False without calling Discord if their DMs are known to be closed"""
+        if self.dms_closed(user.id):
+            self.results.inc('skipped_closed')
+            return False
+        try:
+            await user.send(**kwargs)
+        except discord.Forbidden:
+            self._closed[user.id] = time.monotonic() + self.closed_ttl
+            self.results.inc('closed')
+            return False
+        self.results.inc('sent')
+        return True
+
+    async def dm_with_channel_ack(self, ctx, ack, **kwargs):
+        """DM the author and post `ack` in the channel at the same time.
+
+        If the DM cannot be delivered the acknowledgement is replaced with the
+        DM content; authors with closed DMs get the content in the channel directly.
+        """
+        if self.dms_closed(ctx.author.id):
+            self.results.inc('skipped_closed')
+            await ctx.send(**kwargs)
+            return
+        delivered, ack_message = await asyncio.gather(self.send_dm(ctx.author, **kwargs), ctx.send(ack))
+        if not delivered:
+            await ack_message.edit(content=kwargs.get('content'), embed=kwargs.get('embed'))
+
+    def enqueue(self, user_id, **kwargs):
+        """Queue a DM to be sent by the background workers; returns False if the queue is full"""
+        if self.dms_closed(user_id):
+            self.results.inc('skipped_closed')
+            return True
+        try:
+            self._queue.put_nowait((user_id, kwargs))
+        except asyncio.QueueFull:
+            self.results.inc('dropped')
+            return False
+        return True
+
+    async def run_worker(self):
+        while True:
+            user_id, kwargs = await self._queue.get()
+            try:
+                user = await bot.get_or_fetch_user(user_id)
+                if user is not None:
+                    await self.send_dm(user, **kwargs)
+            except Exception as e:
+                self.results.inc('failed')
+                log.error("Error sending notification to %s: %s", user_id, e)
+            finally:
+                self._queue.task_done()
+
+    def start_workers(self):
+        return [asyncio.create_task(self.run_worker()) for _ in range(self.concurrency)]
+
+notifier = NotificationDispatcher()
+
+class Outbox:
+    """Durable SQLite queue of idempotent mutations that could not reach the backend.
+
+    Entries keep their idempotency key, so replaying one that did reach the
+    backend before failing cannot create a duplicate. SQLite calls run in a
+    worker thread to keep them off the event loop.
+    """
+
+    def __init__(self, path=OUTBOX_PATH):
+        self.path = path
+        self.pending = 0
+        self.replayed = 0
+        self.failed = 0
+        self._db = None
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS outbox ('
+                ' id INTEGER PRIMARY KEY AUTOINCREMENT,'
+                ' idempotency_key TEXT NOT NULL UNIQUE,'
+                ' path TEXT NOT NULL,'
+                ' payload TEXT NOT NULL,'
+                ' user_id INTEGER NOT NULL,'
+                ' context TEXT NOT NULL,'
+                ' attempts INTEGER NOT NULL DEFAULT 0,'
+                ' created_at REAL NOT NULL)'
+            )
+            self.pending = db.execute('SELECT COUNT(*) FROM outbox').fetchone()[0]
+            self._db = db
+        return self._db
+
+    def _insert(self, key, path, payload, user_id, context):
+        with self._lock:
+            cursor = self._connect().execute(
+                'INSERT OR IGNORE INTO outbox (idempotency_key, path, payload, user_id, context, created_at)'
+                ' VALUES (?, ?, ?, ?, ?, ?)',
+                (key, path, json.dumps(payload), user_id, json.dumps(context), time.time())
+            )
+            self.pending += cursor.rowcount
+
+    def _fetch_batch(self, limit):
+        with self._lock:
+            return self._connect().execute(
+                'SELECT id, idempotency_key, path, payload, user_id, context FROM outbox ORDER BY id LIMIT ?',
+                (limit,)
+            ).fetchall()
+
+    def _delete(self, entry_id):
+        with self._lock:
+            self.pending -= self._connect().execute('DELETE FROM outbox WHERE id = ?', (entry_id,)).rowcount
+
+    def _record_attempt(self, entry_id):
+        with self._lock:
+            self._connect().execute('UPDATE outbox SET attempts = attempts + 1 WHERE id = ?', (entry_id,))
+
+    async def add(self, key, path, payload, user_id, context=None):
+        """Store a POST for later delivery; adding the same key twice keeps one entry"""
+        await asyncio.to_thread(self._insert, key, path, payload, user_id, context or {})
+
+    async def _replay_one(self, row):
+        entry_id, key, path, payload, user_id, context = row
+        context = json.loads(context)
+        try:
+            response = await backend.post(path, json=json.loads(payload), idempotency_key=key)
+        except (BackendUnavailable, aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            await asyncio.to_thread(self._record_attempt, entry_id)
+            return False
+        if response.status_code in RETRYABLE_STATUSES:
+            await asyncio.to_thread(self._record_attempt, entry_id)
+            return False
+
+        await asyncio.to_thread(self._delete, entry_id)
+        try:
+            data = response.json()
+        except ValueError:
+            data = {}
+        if 200 <= response.status_code < 300:
+            self.replayed += 1
+            backend.cache.invalidate(f'/api/users/{user_id}/*')
+            if 'commission_id' in context:
+                invalidate_commission(context['commission_id'])
+                invalidate_karma()
+                await refresh_commission(context['commission_id'])
+            if 'commission_type' in context:
+                message = (f"✅ Your queued **{context['commission_type']}** request has been submitted "
+                           f"for admin approval as Commission #{data.get('commission_id')}.")
+            else:
+                message = f"✅ {data.get('message', 'Your queued request has been processed.')}"
+        else:
+            self.failed += 1
+            message = f"❌ Your queued request could not be processed: {data.get('error', 'Unknown error')}"
+        notifier.enqueue(user_id, content=message)
+        return True
+
+    async def replay(self, batch_size=OUTBOX_BATCH_SIZE):
+        """Send one batch concurrently; returns how many entries left the outbox"""
+        rows = await asyncio.to_thread(self._fetch_batch, batch_size)
+        results = await asyncio.gather(*(self._replay_one(row) for row in rows))
+        return sum(results)
+
+    async def run(self, interval=OUTBOX_REPLAY_INTERVAL):
+        """Flush the outbox whenever the backend circuit is closed"""
+        await asyncio.to_thread(self._connect)
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                while self.pending and not backend.health.is_open:
+                    if not await self.replay():
+                        break
+            except Exception:
+                log.exception("Error replaying outbox")
+
+    def stats(self):
+        return {"pending": self.pending, "replayed": self.replayed, "failed": self.failed}
+
+outbox = Outbox()
+
+# Failures after which a mutation is kept in the outbox instead of being dropped
+TRANSIENT_ERRORS = (BackendUnavailable, aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+async def post_or_queue(path, payload, key, user_id, context=None):
+    """POST an idempotent mutation, or store it in the outbox and return None if the backend is unreachable"""
+    try:
+        response = await backend.post(path, json=payload, idempotency_key=key)
+    except TRANSIENT_ERRORS:
+        response = None
+    if response is None or response.status_code in RETRYABLE_STATUSES:
+        await outbox.add(key, path, payload, user_id, context)
+        return None
+    return response
+
+def command_tree_hash(commands, application_id):
+    """Stable hash of the command payloads Discord would receive for this application"""
+    payload = sorted((cmd.to_dict() for cmd in commands), key=lambda data: (data['name'], data.get('type', 1)))
+    blob = json.dumps([str(application_id), payload], sort_keys=True, default=str)
+    return hashlib.sha256(blob.encode()).hexdigest()
+
+class CommissionBot(discord.AutoShardedBot if SHARDED else discord.Bot):
+    """discord.Bot that owns the shared backend client and the background monitors"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Port for the in-loop status server; None leaves serving to Flask
+        self.status_port = None
+        self._status_runner = None
+        self._background_tasks = []
+
+    async def start(self, *args, **kwargs):
+        if self.status_port is not None and self._status_runner is None:
+            self._status_runner = await start_status_server(self.status_port)
+            mark_startup('status_server')
+        if not self._background_tasks:
+            self._background_tasks = [
+                asyncio.create_task(backend.health.run(backend)),
+                asyncio.create_task(metrics.monitor_loop_lag()),
+                asyncio.create_task(keep_status_snapshot_fresh()),
+                asyncio.create_task(outbox.run()),
+                asyncio.create_task(skill_index.load()),
+                asyncio.create_task(expiry_scheduler.run()),
+                *notifier.start_workers()
+            ]
+        await super().start(*args, **kwargs)
+
+    async def login(self, token):
+        await super().login(token)
+        mark_startup('logged_in')
+
+    async def on_connect(self):
+        mark_startup('gateway_connected')
+        if not self.auto_sync_commands:
+            return
+        if self._restore_synced_commands():
+            mark_startup('commands_unchanged')
+            return
+        await self.sync_commands()
+        self._save_synced_commands()
+        mark_startup('commands_synced')
+
+    def _restore_synced_commands(self):
+        """Reuse the command IDs from the last sync if the command tree has not changed"""
+        commands = self.pending_application_commands
+        if not COMMAND_SYNC_CACHE or any(cmd.guild_ids for cmd in commands):
+            return False
+        try:
+            with open(COMMAND_SYNC_CACHE) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if cached.get('hash') != command_tree_hash(commands, self.application_id):
+            return False
+
+        restored = {}
+        for name, command_type, command_id in cached.get('commands', []):
+            cmd = discord.utils.get(commands, name=name, type=command_type)
+            if cmd is None:
+                return False
+            restored[command_id] = cmd
+        for command_id, cmd in restored.items():
+            cmd.id = command_id
+            self._application_commands[command_id] = cmd
+        log.info("Command tree unchanged, skipped sync of %s commands", len(restored))
+        return True
+
+    def _save_synced_commands(self):
+        if not COMMAND_SYNC_CACHE:
+            return
+        cached = {
+            'hash': command_tree_hash(self.pending_application_commands, self.application_id),
+            'commands': [[cmd.name, cmd.type, command_id] for command_id, cmd in self._application_commands.items()]
+        }
+        # Shard workers may save at the same time; replace the file atomically
+        temp_path = f'{COMMAND_SYNC_CACHE}.{os.getpid()}.tmp'
+        try:
+            with open(temp_path, 'w') as f:
+                json.dump(cached, f)
+            os.replace(temp_path, COMMAND_SYNC_CACHE)
+        except OSError as e:
+            log.warning("Could not save command sync cache: %s", e)
+
+    async def invoke_application_command(self, ctx):
+        name = ctx.command.qualified_name
+        metrics.command_invocations.inc(name)
+        correlation_id.set(str(ctx.interaction.id))
+        current_command.set(name)
+        retry_after = rate_limiter.check(ctx.user.id, ctx.guild_id, name)
+        if retry_after:
+            await ctx.respond(f"⏳ You're doing that too often. Try again in {math.ceil(retry_after)}s.",
+                              ephemeral=True)
+            return
+        started = time.perf_counter()
+        try:
+            await super().invoke_application_command(ctx)
+        finally:
+            metrics.command_latency.observe(time.perf_counter() - started, name)
+
+    async def on_application_command_error(self, ctx, exception):
+        metrics.command_errors.inc(ctx.command.qualified_name, 'unhandled')
+        await super().on_application_command_error(ctx, exception)
+
+    async def close(self):
+        command_tasks.cancel_all()
+        for task in self._background_tasks:
+            task.cancel()
+        self._background_tasks = []
+        if self._status_runner is not None:
+            await self._status_runner.cleanup()
+            self._status_runner = None
+        await backend.close()
+        await super().close()
+
+# Use discord.Bot for slash commands
+bot = CommissionBot(command_prefix='!', intents=intents, **gateway_options)
+
+class AdminRoles:
+    """Resolves ADMIN_ROLE_NAME to a role ID once per guild and checks members against it"""
+
+    def __init__(self, role_name):
+        self.role_name = role_name.lower()
+        self.denials = 0
+        self._role_ids = {}
+
+    def role_id(self, guild):
+        if guild.id not in self._role_ids:
+            self._role_ids[guild.id] = next(
+                (role.id for role in guild.roles if role.name.lower() == self.role_name), None
+            )
+        return self._role_ids[guild.id]
+
+    def is_admin(self, user):
+        # Users outside a guild (DMs) have no roles
+        guild = getattr(user, 'guild', None)
+        if guild is None:
+            return False
+        role_id = self.role_id(guild)
+        return role_id is not None and user.get_role(role_id) is not None
+
+    def invalidate(self, guild_id):
+        self._role_ids.pop(guild_id, None)
+
+admin_roles = AdminRoles(ADMIN_ROLE_NAME)
+
+def admin_only(func):
+    """Reject the command with an ephemeral reply unless the user has the admin role"""
+    @functools.wraps(func)
+    async def wrapper(ctx, *args, **kwargs):
+        if not admin_roles.is_admin(ctx.user):
+            admin_roles.denials += 1
+            await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
+            return
+        return await func(ctx, *args, **kwargs)
+    return wrapper
+
+class CommandTasks:
+    """Tracks the work of deferred commands so timeouts and shutdown are handled in one place"""
+
+    # Seconds kept back from the timeout for queueing a mutation and replying after the backend gives up
+    REPLY_RESERVE = 2.0
+
+    def __init__(self, timeout=COMMAND_TIMEOUT):
+        self.timeout = timeout
+        self._tasks = set()
+
+    async def run(self, ctx, coro):
+        # The task copies the current context, so its backend calls see the deadline
+        reserve = min(self.REPLY_RESERVE, self.timeout / 5)
+        token = command_deadline.set(asyncio.get_running_loop().time() + self.timeout - reserve)
+        try:
+            task = asyncio.create_task(coro)
+        finally:
+            command_deadline.reset(token)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        try:
+            await asyncio.wait_for(task, self.timeout)
+        except asyncio.TimeoutError:
+            metrics.command_timeouts.inc(ctx.command.qualified_name)
+            log.warning("Command timed out after %ss", self.timeout)
+            await ctx.respond("⌛ The commission system is taking too long. Please try again later.",
+                              ephemeral=True)
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+
+    def __len__(self):
+        return len(self._tasks)
+
+command_tasks = CommandTasks()
+
+def record_command_error(ctx, cause):
+    """Count a failure the handler answered itself; `cause` is the exception or backend response.
+
+    Handlers reply to their own errors, so on_application_command_error alone
+    would miss almost every failure. Only the first failure of an invocation
+    counts, e.g. not an error body that then fails to parse.
+    """
+    if getattr(ctx, 'error_recorded', False):
+        return
+    ctx.error_recorded = True
+    if isinstance(cause, BackendResponse):
+        kind = f'{cause.status_code // 100}xx'
+    elif isinstance(cause, BackendUnavailable):
+        kind = 'circuit_open'
+    elif isinstance(cause, (aiohttp.ClientConnectionError, asyncio.TimeoutError)):
+        kind = 'unreachable'
+    elif cause is None:
+        kind = 'backend_error'
+    else:
+        kind = 'exception'
+    metrics.command_errors.inc(ctx.command.qualified_name, kind)
+
+def deferred(ephemeral=True):
+    """Acknowledge the interaction at once and deliver the handler's responses as follow-ups.
+
+    Discord fails interactions that get no response within 3 seconds; a
+    deferred one shows "thinking…" until the first follow-up arrives.
+    `ephemeral` applies to every follow-up, as Discord fixes it at defer time.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(ctx, *args, **kwargs):
+            await ctx.defer(ephemeral=ephemeral)
+            await command_tasks.run(ctx, func(ctx, *args, **kwargs))
+        return wrapper
+    return decorator
 
 @bot.event
 async def on_ready():
-    print(f'{bot.user} has connected to Discord!')
+    mark_startup('ready')
+    log.info("%s has connected to Discord!", bot.user)
+    refresh_status_snapshot()
+
+@bot.event
+async def on_guild_role_create(role):
+    admin_roles.invalidate(role.guild.id)
+
+@bot.event
+async def on_guild_role_delete(role):
+    admin_roles.invalidate(role.guild.id)
+
+@bot.event
+async def on_guild_role_update(before, after):
+    if before.name != after.name:
+        admin_roles.invalidate(after.guild.id)
+
+# Embeds
+# Discord rejects embeds over these sizes at send time
+EMBED_TITLE_LIMIT = 256
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_FIELD_NAME_LIMIT = 256
+EMBED_FIELD_VALUE_LIMIT = 1024
+EMBED_FOOTER_LIMIT = 2048
+EMBED_FIELDS_LIMIT = 25
+EMBED_TOTAL_LIMIT = 6000
+
+STATUS_EMOJI = {
+    'pending': '⏳',
+    'approved': '✅',
+    'rejected': '❌',
+    'accepted': '🤝',
+    'completed': '✅',
+    'expired': '⏰'
+}
+RANK_EMOJI = {1: "🥇", 2: "🥈", 3: "🥉"}
+
+def truncate(text, limit):
+    """Shorten `text` to at most `limit` characters, marking the cut with '...'"""
+    text = str(text)
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+def build_embed(title=None, description=None, color=0x7289DA, fields=(), footer=None):
+    """Build an embed from (name, value, inline) fields, clipped to Discord's size limits.
+
+    The description and then the footer are clipped to what the title
+    leaves of the 6000-character total; fields past the 25-field limit or
+    the remaining budget are dropped and counted in the footer instead of
+    failing the send.
+    """
+    # Kept back for the "N more not shown" note
+    budget = EMBED_TOTAL_LIMIT - 32
+    title = truncate(title, EMBED_TITLE_LIMIT) if title else None
+    budget -= len(title or '')
+    description = truncate(description, min(EMBED_DESCRIPTION_LIMIT, budget)) if description else None
+    budget -= len(description or '')
+    footer = truncate(footer, min(EMBED_FOOTER_LIMIT - 32, budget)) if footer else ''
+    budget -= len(footer)
+    embed = discord.Embed(title=title, description=description, color=color)
+
+    fields = list(fields)
+    shown = 0
+    for name, value, inline in fields[:EMBED_FIELDS_LIMIT]:
+        name = truncate(name, EMBED_FIELD_NAME_LIMIT) or '\u200b'
+        value = truncate(value, EMBED_FIELD_VALUE_LIMIT) or '\u200b'
+        budget -= len(name) + len(value)
+        if budget < 0:
+            break
+        embed.add_field(name=name, value=value, inline=inline)
+        shown += 1
+    hidden = len(fields) - shown
+    if hidden:
+        footer = ' · '.join(filter(None, (footer, f"{hidden} more not shown")))
+    if footer:
+        embed.set_footer(text=footer)
+    return embed
+
+class CardTemplate:
+    """Declarative layout of one embed field: a name format, value lines and per-key clip widths"""
+
+    def __init__(self, name, lines, inline=False, clip=None):
+        self.name = name
+        self.value = '\n'.join(lines)
+        self.inline = inline
+        self.clip = clip or {}
+
+    def render(self, item, **extra):
+        values = {**item, **extra}
+        for key, width in self.clip.items():
+            values[key] = truncate(values[key], width)
+        return self.name.format(**values), self.value.format(**values), self.inline
+
+USER_COMMISSION_CARD = CardTemplate(
+    "{emoji} Commission #{id}",
+    ("**Type:** {commission_type}", "**Status:** {status_title}", "**Skills:** {skills}"),
+    inline=True, clip={'skills': 53}
+)
+PENDING_COMMISSION_CARD = CardTemplate(
+    "Commission #{id}",
+    ("**Type:** {commission_type}", "**Creator:** <@{creator_id}>", "**Skills:** {skills}", "**Created:** {created}"),
+    clip={'skills': 103}
+)
+REPORT_CARD = CardTemplate(
+    "{emoji} Report #{id}",
+    ("**Commission:** #{commission_id}", "**Reporter:** <@{reporter_id}>", "**Type:** {type_title}",
+     "**Reason:** {reason}"),
+    clip={'reason': 103}
+)
+LEADERBOARD_CARD = CardTemplate(
+    "{rank} {name}",
+    ("**Karma:** {karma_points}", "**Completed:** {completed_commissions}", "**Rating:** {average_rating:.1f}/5"),
+    inline=True
+)
+MATCH_CARD = CardTemplate(
+    "#{id} · {commission_type} · {score:.0%}",
+    ("**By:** <@{creator_id}>", "**Skills:** {skills}", "**Shared:** {shared}"),
+    clip={'skills': 103}
+)
+# (label, value format, stats key, default) for the /mystats card
+STAT_FIELDS = (
+    ("Total Commissions", "{}", 'total_commissions', 0),
+    ("Completed", "{}", 'completed_commissions', 0),
+    ("Success Rate", "{:.1f}%", 'success_rate', 0),
+    ("Average Rating", "{:.1f}/5", 'average_rating', 0),
+    ("Karma Points", "{}", 'karma_points', 0),
+    ("Rank", "#{}", 'rank', 'N/A')
+)
+
+COMMISSION_TYPES_HELP = ("**Types:**\n"
+                         "• `merc` - Merc for Hire\n"
+                         "• `team` - Merc Team for Hire\n"
+                         "• `task` - Task for a Merc Team\n\n")
+
+# Static embeds are built once; sending only serialises them
+COMMISSION_USAGE_EMBED = build_embed(
+    "Commission Creation",
+    "Usage: `!commission <type> <skills>`\n\n" + COMMISSION_TYPES_HELP +
+    "**Example:** `!commission merc Python, Web Development, API Integration`"
+)
+SUBMIT_EMBED = build_embed(
+    "📝 Commission Submission",
+    "Let's create your commission request!\n\n"
+    "Use the following format:\n"
+    "`!commission <type> <skills>`\n\n" + COMMISSION_TYPES_HELP +
+    "**Example:**\n"
+    "`!commission merc Python, Web Development, API Integration`"
+)
+HELP_COMMISSION_EMBED = build_embed(
+    "🔧 Commission Bot Commands",
+    "Commands for managing mercenary commissions",
+    fields=[
+        ("📝 Create Commission", "`!commission <type> <skills>`\n"
+                                "Types: `merc`, `team`, `task`", False),
+        ("🤝 Accept Commission", "`!accept <commission_id>`\n"
+                                "Accept an approved commission", False),
+        ("📋 Commission Types", "• **merc** - Individual for hire\n"
+                               "• **team** - Team for hire\n"
+                               "• **task** - Task for a team", False)
+    ]
+)
+HELP_SLASH_EMBED = build_embed(
+    "🔧 Commission Bot Commands",
+    "Slash commands for managing mercenary commissions",
+    fields=[
+        ("👤 User Commands", "`/submit` - Start commission submission\n"
+                            "`/mycommissions` - View your commissions\n"
+                            "`/mystats` - View your stats\n"
+                            "`/commission <id>` - View commission details\n"
+                            "`/match <id>` - Find commissions that fit its skills\n"
+                            "`/complete <id>` - Mark commission complete\n"
+                            "`/report <id>` - Submit karma report\n"
+                            "`/leaderboard` - View karma rankings", False),
+        ("🛡️ Admin Commands", "`/pending` - List pending commissions\n"
+                             "`/approve <id>` - Approve commission\n"
+                             "`/reject <id>` - Reject commission\n"
+                             "`/bulk_approve <ids>` - Approve a list or range\n"
+                             "`/bulk_reject <ids>` - Reject a list or range\n"
+                             "`/reports` - View karma reports\n"
+                             "`/set_admin_channel` - Set admin channel\n"
+                             "`/set_public_channel` - Set public channel", False)
+    ]
+)
+
+def commission_detail_embed(comm):
+    """Detail card for /commission"""
+    fields = [("Skills Required", comm['skills'], False),
+              ("Status", comm['status'].title(), True),
+              ("Creator", f"<@{comm['user']['discord_id']}>", True)]
+    if comm.get('accepter'):
+        fields.append(("Accepter", f"<@{comm['accepter']['discord_id']}>", True))
+    if comm.get('created_at'):
+        fields.append(("Created", comm['created_at'][:19], True))
+    if comm.get('expires_at'):
+        fields.append(("Expires", comm['expires_at'][:19], True))
+    return build_embed(f"📋 Commission #{comm['id']}", f"**Type:** {comm['commission_type']}", fields=fields)
 
 @bot.command(name='commission')
 async def create_commission(ctx, commission_type=None, *, skills=None):
     """Create a new commission request"""
     if not commission_type or not skills:
-        embed = discord.Embed(
-            title="Commission Creation",
-            description="Usage: `!commission <type> <skills>`\n\n"
-                       "**Types:**\n"
-                       "• `merc` - Merc for Hire\n"
-                       "• `team` - Merc Team for Hire\n"
-                       "• `task` - Task for a Merc Team\n\n"
-                       "**Example:** `!commission merc Python, Web Development, API Integration`",
-            color=0x7289DA
-        )
-        await ctx.send(embed=embed)
+        await ctx.send(embed=COMMISSION_USAGE_EMBED)
         return
 
     valid_types = {
@@ -53,423 +1426,913 @@ async def create_commission(ctx, commission_type=None, *, skills=None):
         return
 
     # Call Flask API to create commission
+    payload = {
+        'discord_id': str(ctx.author.id),
+        'username': ctx.author.name,
+        'display_name': ctx.author.display_name,
+        'commission_type': valid_types[commission_type],
+        'skills': skills.strip()
+    }
+    key = idempotency_key(ctx, 'create_commission')
     try:
-        print(f"Connecting to Flask server at: {FLASK_SERVER_URL}")
-        
-        # Test if Flask server is reachable
-        health_response = requests.get(f'{FLASK_SERVER_URL}/', timeout=10)
-        if health_response.status_code != 200:
-            await ctx.send("❌ Commission system is currently offline. Please try again later.")
+        # Only the POST decides whether to queue; Discord errors below must not re-submit it
+        response = await post_or_queue('/api/commissions', payload, key, ctx.author.id,
+                                       {'commission_type': valid_types[commission_type]})
+        if response is None:
+            await ctx.send("📥 The commission system is unreachable right now, so your submission has been queued. "
+                           "You'll get a DM with your commission ID as soon as it's processed.")
             return
-        
-        response = requests.post(f'{FLASK_SERVER_URL}/api/commissions', 
-            json={
-                'discord_id': str(ctx.author.id),
-                'username': ctx.author.name,
-                'display_name': ctx.author.display_name,
-                'commission_type': valid_types[commission_type],
-                'skills': skills.strip()
-            },
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
-        )
-        
-        print(f"API Response Status: {response.status_code}")
-        print(f"API Response Text: {response.text}")
-        
+
+        log.debug("Commission submission response", extra={'fields': {'status': response.status_code}})
+
         if response.status_code == 201:
             data = response.json()
-            embed = discord.Embed(
-                title="✅ Commission Submitted",
-                description=f"Your **{valid_types[commission_type]}** request has been submitted for admin approval.\n\n"
-                           f"**Skills:** {skills}\n"
-                           f"**Commission ID:** #{data['commission_id']}\n\n"
-                           f"You'll receive a DM when your commission is approved or if there are any updates.",
+            backend.cache.invalidate(f'/api/users/{ctx.author.id}/*')
+            commission_index.add(ctx.author.id, {'id': data['commission_id'], 'status': 'pending',
+                                                 'commission_type': valid_types[commission_type],
+                                                 'skills': skills.strip()})
+            embed = build_embed(
+                "✅ Commission Submitted",
+                f"Your **{valid_types[commission_type]}** request has been submitted for admin approval.\n\n"
+                f"**Skills:** {truncate(skills, EMBED_FIELD_VALUE_LIMIT)}\n"
+                f"**Commission ID:** #{data['commission_id']}\n\n"
+                f"You'll receive a DM when your commission is approved or if there are any updates.",
                 color=0x00FF00
             )
-            try:
-                await ctx.author.send(embed=embed)
-                await ctx.send(f"✅ Commission submitted! Check your DMs for confirmation.")
-            except discord.Forbidden:
-                await ctx.send(embed=embed)
+            await notifier.dm_with_channel_ack(ctx, "✅ Commission submitted! Check your DMs for confirmation.",
+                                               embed=embed)
         else:
+            record_command_error(ctx, response)
             try:
                 error_data = response.json()
                 error_msg = f"❌ {error_data.get('error', 'Unknown error occurred')}"
             except:
                 error_msg = f"❌ Server error (Status: {response.status_code})"
             
-            try:
-                await ctx.author.send(error_msg)
-                await ctx.send("❌ Commission creation failed. Check your DMs for details.")
-            except discord.Forbidden:
-                await ctx.send(error_msg)
+            await notifier.dm_with_channel_ack(ctx, "❌ Commission creation failed. Check your DMs for details.",
+                                               content=error_msg)
             
-    except requests.exceptions.ConnectionError:
-        await ctx.send("❌ Cannot connect to commission system. Please check server status.")
-    except requests.exceptions.Timeout:
-        await ctx.send("❌ Commission system timeout. Please try again later.")
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        record_command_error(ctx, e)
+        log.exception("Unexpected error in commission submission")
         await ctx.send(f"❌ Error connecting to commission system. Please contact admin.")
 
-@bot.command(name='accept')
-async def accept_commission(ctx, commission_id: int):
-    """Accept a commission"""
-    try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/commissions/{commission_id}/accept', json={
-            'discord_id': str(ctx.author.id),
-            'username': ctx.author.name,
-            'display_name': ctx.author.display_name
-        })
-        
-        if response.status_code == 200:
-            data = response.json()
-            embed = discord.Embed(
-                title="🤝 Commission Accepted",
-                description=f"Commission #{commission_id} has been accepted!\n\n"
-                           f"Please coordinate with the commission creator.\n"
-                           f"You can now discuss project details and timeline.",
-                color=0x00FF00
-            )
-            try:
-                await ctx.author.send(embed=embed)
-                await ctx.send(f"✅ Commission #{commission_id} accepted! Check your DMs for details.")
-            except discord.Forbidden:
-                await ctx.send(embed=embed)
+@bot.command(name='accept')
+async def accept_commission(ctx, commission_id: int):
+    """Accept a commission"""
+    try:
+        response = await backend.post(f'/api/commissions/{commission_id}/accept',
+            json={
+                'discord_id': str(ctx.author.id),
+                'username': ctx.author.name,
+                'display_name': ctx.author.display_name
+            },
+            idempotency_key=idempotency_key(ctx, 'accept_commission')
+        )
+        
+        if response.status_code == 200:
+            data = response.json()
+            invalidate_commission(commission_id)
+            # Taken commissions stop matching even if the re-read below fails
+            skill_index.remove(commission_id)
+            await refresh_commission(commission_id)
+            embed = build_embed(
+                "🤝 Commission Accepted",
+                f"Commission #{commission_id} has been accepted!\n\n"
+                f"Please coordinate with the commission creator.\n"
+                f"You can now discuss project details and timeline.",
+                color=0x00FF00
+            )
+            await notifier.dm_with_channel_ack(ctx, f"✅ Commission #{commission_id} accepted! Check your DMs for details.",
+                                               embed=embed)
+        else:
+            record_command_error(ctx, response)
+            error_data = response.json()
+            error_msg = f"❌ {error_data.get('error', 'Unknown error occurred')}"
+            await notifier.dm_with_channel_ack(ctx, "❌ Commission acceptance failed. Check your DMs for details.",
+                                               content=error_msg)
+            
+    except Exception as e:
+        record_command_error(ctx, e)
+        await ctx.send(f"❌ Error connecting to commission system: {e}")
+
+@bot.command(name='help_commission')
+async def help_commission(ctx):
+    """Show help for commission commands"""
+    await ctx.send(embed=HELP_COMMISSION_EMBED)
+
+# Pagination
+class Page:
+    """One page of a list endpoint"""
+
+    def __init__(self, items, number, cursor, next_cursor, total):
+        self.items = items
+        self.number = number
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.total = total
+
+async def fetch_page(path, items_key, cursor=None, number=1, limit=PAGE_SIZE, cache_ttl=None, fields=None):
+    """Fetch one page of `path` using cursor/limit pagination.
+
+    Returns None when the backend answers with an error status. Backends that
+    ignore the paging parameters and return the whole list are paged locally,
+    with the cursor read as an offset.
+    """
+    params = {'limit': limit}
+    if cursor is not None:
+        params['cursor'] = cursor
+    response = await backend.get(path, params=params, cache_ttl=cache_ttl, fields=fields)
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    items = data.get(items_key, [])
+    if 'next_cursor' in data:
+        return Page(items, number, cursor, data['next_cursor'], data.get('total'))
+    offset = int(cursor or 0)
+    next_cursor = str(offset + limit) if offset + limit < len(items) else None
+    return Page(items[offset:offset + limit], number, cursor, next_cursor, len(items))
+
+class PaginatorView(discord.ui.View):
+    """Previous/Next buttons that fetch further pages from the backend on demand"""
+
+    def __init__(self, user_id, path, items_key, render, page, cache_ttl=None, fields=None):
+        super().__init__(timeout=PAGINATOR_TIMEOUT, disable_on_timeout=True)
+        self.user_id = user_id
+        self.path = path
+        self.items_key = items_key
+        self.render = render
+        self.cache_ttl = cache_ttl
+        self.fields = fields
+        self.page = page
+        # Cursors of the pages already visited, so Previous needs no extra state from the backend
+        self.cursors = [page.cursor]
+        self._update_buttons()
+
+    def _update_buttons(self):
+        self.previous_page.disabled = self.page.number <= 1
+        self.next_page.disabled = self.page.next_cursor is None
+
+    async def interaction_check(self, interaction):
+        return interaction.user.id == self.user_id
+
+    async def _show(self, interaction, cursor, number):
+        # Components get the same 3 seconds as commands; acknowledge before the backend call
+        await interaction.response.defer()
+        try:
+            page = await fetch_page(self.path, self.items_key, cursor=cursor, number=number,
+                                    cache_ttl=self.cache_ttl, fields=self.fields)
+        except Exception as e:
+            log.error("Error fetching page %s of %s: %s", number, self.path, e)
+            page = None
+        if page is None:
+            await interaction.followup.send("❌ Error fetching the next page. Try again later.", ephemeral=True)
+            return
+        self.page = page
+        del self.cursors[number - 1:]
+        self.cursors.append(cursor)
+        self._update_buttons()
+        await interaction.edit_original_response(embed=self.render(page), view=self)
+
+    @discord.ui.button(label="◀ Previous", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, button, interaction):
+        number = self.page.number - 1
+        await self._show(interaction, self.cursors[number - 1], number)
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, button, interaction):
+        await self._show(interaction, self.page.next_cursor, self.page.number + 1)
+
+async def respond_paginated(ctx, page, path, items_key, render, cache_ttl=None, ephemeral=True, fields=None):
+    """Respond with the first page, attaching a paginator when more pages exist"""
+    if page.next_cursor is None:
+        await ctx.respond(embed=render(page), ephemeral=ephemeral)
+        return
+    view = PaginatorView(ctx.user.id, path, items_key, render, page, cache_ttl=cache_ttl, fields=fields)
+    await ctx.respond(embed=render(page), view=view, ephemeral=ephemeral)
+
+def page_footer(page):
+    if page.number > 1 or page.next_cursor is not None:
+        return f"Page {page.number}"
+    return None
+
+def render_user_commissions(page):
+    return build_embed(
+        "📋 Your Commission History",
+        f"Found {page.total} commissions" if page.total is not None else None,
+        fields=[USER_COMMISSION_CARD.render(comm, emoji=STATUS_EMOJI.get(comm['status'], '❓'),
+                                            status_title=comm['status'].title())
+                for comm in page.items],
+        footer=page_footer(page)
+    )
+
+def render_pending_commissions(page):
+    return build_embed(
+        "⏳ Pending Commissions",
+        f"Found {page.total} pending approval" if page.total is not None else None,
+        color=0xFFAA00,
+        fields=[PENDING_COMMISSION_CARD.render(comm, creator_id=comm['user']['discord_id'],
+                                               created=comm['created_at'][:19])
+                for comm in page.items],
+        footer=page_footer(page)
+    )
+
+def render_pending_reports(page):
+    return build_embed(
+        "📋 Pending Karma Reports",
+        f"Found {page.total} pending reports" if page.total is not None else None,
+        color=0xFFAA00,
+        fields=[REPORT_CARD.render(report, emoji="👍" if report['report_type'] == 'positive' else "👎",
+                                   type_title=report['report_type'].title())
+                for report in page.items],
+        footer=page_footer(page)
+    )
+
+# Bulk moderation
+def parse_commission_ids(text):
+    """Parse IDs and ranges such as "12, 15-20 31" into a sorted list of unique IDs"""
+    ids = set()
+    for part in text.replace(',', ' ').split():
+        start, sep, end = part.partition('-')
+        try:
+            start, end = int(start), int(end) if sep else None
+        except ValueError:
+            raise ValueError(f"Invalid commission ID `{part}`") from None
+        if sep:
+            if start > end:
+                raise ValueError(f"Invalid range `{part}`")
+            if end - start >= BULK_MAX_IDS:
+                raise ValueError(f"Range `{part}` is larger than {BULK_MAX_IDS} IDs")
+            ids.update(range(start, end + 1))
+        else:
+            ids.add(start)
+        if len(ids) > BULK_MAX_IDS:
+            raise ValueError(f"At most {BULK_MAX_IDS} commissions can be processed at once")
+    if not ids:
+        raise ValueError("No commission IDs given")
+    return sorted(ids)
+
+async def moderate_commissions(action, commission_ids, admin, reason=None):
+    """Approve or reject many commissions in a single backend request"""
+    payload = {
+        'action': action,
+        'commission_ids': commission_ids,
+        'admin_id': str(admin.id),
+        'admin_name': admin.display_name
+    }
+    if reason is not None:
+        payload['reason'] = reason
+    response = await backend.post('/api/commissions/bulk', json=payload)
+    if response.status_code == 200:
+        backend.cache.invalidate('/api/commissions/*', '/api/users/*/commissions*')
+    return response
+
+def format_bulk_results(action, response):
+    """Summarize the per-item results of a bulk request in one message"""
+    if response.status_code != 200:
+        try:
+            return f"❌ {response.json().get('error', 'Unknown error')}"
+        except ValueError:
+            return f"❌ Server error (Status: {response.status_code})"
+
+    results = response.json().get('results', [])
+    failed = [result for result in results if not result.get('success')]
+    verb = 'Approved' if action == 'approve' else 'Rejected'
+    lines = [f"✅ {verb} {len(results) - len(failed)} of {len(results)} commissions."]
+    for result in failed[:10]:
+        lines.append(f"❌ #{result.get('id')}: {result.get('error', 'Unknown error')}")
+    if len(failed) > 10:
+        lines.append(f"…and {len(failed) - 10} more failures")
+    return "\n".join(lines)
+
+class PendingModerationView(PaginatorView):
+    """Pending queue paginator with a select menu to approve or reject the chosen commissions"""
+
+    def __init__(self, admin, page):
+        self.admin = admin
+        self.selected_ids = []
+        super().__init__(admin.id, '/api/commissions/pending', 'commissions', render_pending_commissions, page,
+                         fields=FIELD_SETS['pending_commissions'])
+
+    def _update_buttons(self):
+        super()._update_buttons()
+        self.selected_ids = []
+        options = [
+            discord.SelectOption(
+                label=f"#{comm['id']} · {comm['commission_type']}",
+                value=str(comm['id']),
+                description=truncate(comm['skills'], 100)
+            )
+            for comm in self.page.items[:25]
+        ]
+        self.selection.disabled = not options
+        self.selection.options = options or [discord.SelectOption(label="No pending commissions", value="0")]
+        self.selection.max_values = max(len(options), 1)
+
+    @discord.ui.select(placeholder="Select commissions to moderate", min_values=1, max_values=1,
+                       options=[discord.SelectOption(label="No pending commissions", value="0")], row=1)
+    async def selection(self, select, interaction):
+        self.selected_ids = [int(value) for value in select.values]
+        await interaction.response.defer()
+
+    async def _moderate(self, interaction, action):
+        if not self.selected_ids:
+            await interaction.response.send_message("❌ Select at least one commission first.", ephemeral=True)
+            return
+        await interaction.response.defer()
+        try:
+            response = await moderate_commissions(action, self.selected_ids, self.admin,
+                                                  reason="No reason provided" if action == 'reject' else None)
+        except Exception as e:
+            log.error("Error in bulk %s: %s", action, e)
+            await interaction.followup.send("❌ Error contacting commission system.", ephemeral=True)
+            return
+        # Reload the current page so moderated commissions drop out of the queue
+        try:
+            page = await fetch_page(self.path, self.items_key, cursor=self.page.cursor, number=self.page.number,
+                                    fields=self.fields)
+        except Exception as e:
+            log.error("Error reloading %s: %s", self.path, e)
+            page = None
+        if page is not None:
+            self.page = page
+            self._update_buttons()
+            await interaction.edit_original_response(embed=self.render(page), view=self)
+        await interaction.followup.send(format_bulk_results(action, response), ephemeral=True)
+        await apply_bulk_results(action, response)
+
+    @discord.ui.button(label="Approve selected", style=discord.ButtonStyle.success, row=2)
+    async def approve_selected(self, button, interaction):
+        await self._moderate(interaction, 'approve')
+
+    @discord.ui.button(label="Reject selected", style=discord.ButtonStyle.danger, row=2)
+    async def reject_selected(self, button, interaction):
+        await self._moderate(interaction, 'reject')
+
+# Commission autocomplete
+class CommissionIndex:
+    """Bounded per-user index of recent commissions used to answer autocomplete locally.
+
+    A user's index is seeded from the first page of their commission history
+    the first time they need it, then kept current from command results and
+    pushed backend events, so keystrokes never reach the backend.
+    """
+
+    SKILLS_PREFIX = 40
+
+    def __init__(self, max_users=COMMISSION_INDEX_USERS, per_user=COMMISSION_INDEX_PER_USER):
+        self.max_users = max_users
+        self.per_user = per_user
+        self._users = OrderedDict()
+        # Users whose history has been fetched; add() alone does not make an index complete
+        self._seeded = set()
+        self._loading = {}
+
+    def _entries(self, user_id):
+        entries = self._users.get(user_id)
+        if entries is None:
+            entries = self._users[user_id] = OrderedDict()
+            if len(self._users) > self.max_users:
+                evicted, _ = self._users.popitem(last=False)
+                self._seeded.discard(evicted)
+        else:
+            self._users.move_to_end(user_id)
+        return entries
+
+    def _entry(self, commission, previous):
+        return {
+            'id': commission['id'],
+            'commission_type': commission.get('commission_type', previous.get('commission_type', '')),
+            'status': commission.get('status', previous.get('status', '')),
+            'skills': commission.get('skills', previous.get('skills', ''))[:self.SKILLS_PREFIX]
+        }
+
+    def add(self, user_id, commission):
+        """Insert or update a commission, making it the user's most recent"""
+        entries = self._entries(int(user_id))
+        entries[commission['id']] = self._entry(commission, entries.pop(commission['id'], {}))
+        if len(entries) > self.per_user:
+            entries.popitem(last=False)
+
+    def update(self, commission):
+        """Apply a full commission record to its creator's and accepter's indexes"""
+        for party in (commission.get('user'), commission.get('accepter')):
+            if party and party.get('discord_id'):
+                self.add(party['discord_id'], commission)
+
+    def set_status(self, commission_id, status):
+        for entries in self._users.values():
+            if commission_id in entries:
+                entries[commission_id]['status'] = status
+
+    def seed(self, user_id, commissions):
+        """Merge a fetched history page (newest first) beneath the entries already known.
+
+        Known entries keep their place, so commissions learned from events
+        (such as ones the user accepted) survive a first-page refresh.
+        """
+        user_id = int(user_id)
+        known = self._entries(user_id)
+        merged = OrderedDict()
+        for commission in reversed(commissions[:self.per_user]):
+            if commission['id'] in known:
+                known[commission['id']] = self._entry(commission, known[commission['id']])
+            else:
+                merged[commission['id']] = self._entry(commission, {})
+        merged.update(known)
+        while len(merged) > self.per_user:
+            merged.popitem(last=False)
+        self._users[user_id] = merged
+        self._seeded.add(user_id)
+
+    async def ensure_loaded(self, user_id):
+        if user_id in self._seeded:
+            return
+        # Concurrent keystrokes share one load
+        if user_id not in self._loading:
+            self._loading[user_id] = asyncio.ensure_future(self._load(user_id))
+        await asyncio.shield(self._loading[user_id])
+
+    async def _load(self, user_id):
+        try:
+            page = await fetch_page(f'/api/users/{user_id}/commissions', 'commissions',
+                                    limit=self.per_user, cache_ttl=CACHE_TTLS['user_commissions'],
+                                    fields=FIELD_SETS['user_commissions'])
+            if page is not None:
+                self.seed(user_id, page.items)
+        finally:
+            self._loading.pop(user_id, None)
+
+    def suggest(self, user_id, query, preferred_statuses=(), limit=25):
+        """Return up to `limit` entries matching an ID prefix or a type/skills substring"""
+        query = query.strip().lstrip('#').lower()
+        matches = [
+            entry for entry in reversed(self._users.get(user_id, {}).values())
+            if not query or str(entry['id']).startswith(query)
+            or query in entry['commission_type'].lower() or query in entry['skills'].lower()
+        ]
+        matches.sort(key=lambda entry: entry['status'] not in preferred_statuses)
+        return matches[:limit]
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._users.values())
+
+commission_index = CommissionIndex()
+
+def commission_choice(entry):
+    name = f"#{entry['id']} · {entry['commission_type']} · {entry['status'].title()} · {entry['skills']}"
+    return discord.OptionChoice(name=truncate(name, 100), value=entry['id'])
+
+def commission_autocomplete(*preferred_statuses):
+    """Build an autocomplete callback suggesting the invoking user's commissions"""
+    async def autocomplete(ctx):
+        user_id = ctx.interaction.user.id
+        try:
+            await asyncio.wait_for(commission_index.ensure_loaded(user_id), AUTOCOMPLETE_LOAD_TIMEOUT)
+        except Exception as e:
+            log.debug("Autocomplete index load failed: %s", e)
+        return [commission_choice(entry)
+                for entry in commission_index.suggest(user_id, str(ctx.value or ''), preferred_statuses)]
+    return autocomplete
+
+# Skill matching
+# Spellings folded onto one canonical skill before indexing
+SKILL_ALIASES = {
+    'js': 'javascript', 'ts': 'typescript', 'py': 'python', 'golang': 'go',
+    'webdev': 'web development', 'web dev': 'web development', 'web design': 'web design',
+    'frontend': 'front-end', 'front end': 'front-end', 'backend': 'back-end', 'back end': 'back-end',
+    'ml': 'machine learning', 'ai': 'artificial intelligence', 'db': 'database', 'databases': 'database',
+    'apis': 'api', 'k8s': 'kubernetes', 'devops': 'dev ops', 'ui': 'user interface', 'ux': 'user experience'
+}
+SKILL_STOPWORDS = {'and', 'or', 'of', 'the', 'a', 'an', 'for', 'with', 'in', 'to', 'some', 'basic', 'advanced'}
+
+# Commission type -> types that can fill it
+COUNTERPART_TYPES = {
+    'Task for a Merc Team': ('Merc for Hire', 'Merc Team for Hire'),
+    'Merc for Hire': ('Task for a Merc Team',),
+    'Merc Team for Hire': ('Task for a Merc Team',)
+}
+
+def canonical_skill(text):
+    text = ' '.join(re.sub(r'[^\w+#. -]', ' ', text.lower()).split()).strip('. ')
+    return SKILL_ALIASES.get(text, text)
+
+def skill_terms(skills):
+    """Split a free-text skills string into canonical skill phrases plus their significant words"""
+    terms = []
+    for part in re.split(r'[,;/|\n]+|\s+&\s+|\s+and\s+', skills):
+        phrase = canonical_skill(part)
+        if not phrase:
+            continue
+        terms.append(phrase)
+        words = phrase.split()
+        if len(words) > 1:
+            terms.extend(word for word in map(canonical_skill, words) if word not in SKILL_STOPWORDS)
+    return terms
+
+class SkillIndex:
+    """Inverted index of open commissions' skills with TF-IDF/cosine ranking.
+
+    Commissions are added when approved and dropped once they leave that
+    state. Postings are kept per commission type and hold each document's
+    length-normalised term weight (SMART lnc.ltc: idf is applied on the
+    query side only), so a query just walks the postings of its own terms
+    in the counterpart types instead of rescanning every commission.
+    """
+
+    def __init__(self):
+        self.docs = {}
+        # commission type -> term -> {commission id: normalised log-tf weight}
+        self.postings = defaultdict(lambda: defaultdict(dict))
+
+    @staticmethod
+    def _log_tf(skills):
+        counts = defaultdict(int)
+        for term in skill_terms(skills):
+            counts[term] += 1
+        return {term: 1 + math.log(count) for term, count in counts.items()}
+
+    @staticmethod
+    def _normalise(weights):
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1
+        return {term: weight / norm for term, weight in weights.items()}
+
+    def add(self, commission):
+        self.remove(commission['id'])
+        weights = self._normalise(self._log_tf(commission.get('skills', '')))
+        self.docs[commission['id']] = {
+            'commission_type': commission['commission_type'],
+            'creator_id': str((commission.get('user') or {}).get('discord_id', '')),
+            'skills': commission.get('skills', ''),
+            'terms': tuple(weights)
+        }
+        postings = self.postings[commission['commission_type']]
+        for term, weight in weights.items():
+            postings[term][commission['id']] = weight
+
+    def remove(self, commission_id):
+        doc = self.docs.pop(commission_id, None)
+        if doc is None:
+            return
+        postings = self.postings[doc['commission_type']]
+        for term in doc['terms']:
+            del postings[term][commission_id]
+            if not postings[term]:
+                del postings[term]
+
+    def update(self, commission):
+        """Index approved commissions and drop ones that are no longer open"""
+        if commission.get('status') == 'approved' and commission.get('commission_type') in COUNTERPART_TYPES:
+            self.add(commission)
         else:
-            error_data = response.json()
-            error_msg = f"❌ {error_data.get('error', 'Unknown error occurred')}"
-            try:
-                await ctx.author.send(error_msg)
-                await ctx.send("❌ Commission acceptance failed. Check your DMs for details.")
-            except discord.Forbidden:
-                await ctx.send(error_msg)
-            
-    except Exception as e:
-        await ctx.send(f"❌ Error connecting to commission system: {e}")
+            self.remove(commission['id'])
 
-@bot.command(name='help_commission')
-async def help_commission(ctx):
-    """Show help for commission commands"""
-    embed = discord.Embed(
-        title="🔧 Commission Bot Commands",
-        description="Commands for managing mercenary commissions",
-        color=0x7289DA
-    )
-    
-    embed.add_field(
-        name="📝 Create Commission",
-        value="`!commission <type> <skills>`\n"
-              "Types: `merc`, `team`, `task`",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="🤝 Accept Commission",
-        value="`!accept <commission_id>`\n"
-              "Accept an approved commission",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="📋 Commission Types",
-        value="• **merc** - Individual for hire\n"
-              "• **team** - Team for hire\n"
-              "• **task** - Task for a team",
-        inline=False
+    def document_frequency(self, term):
+        return sum(len(postings.get(term, ())) for postings in self.postings.values())
+
+    def match(self, commission, k=MATCH_RESULTS):
+        """Return [(score, commission_id, shared terms)] for the best counterparts of `commission`"""
+        creator_id = str((commission.get('user') or {}).get('discord_id', ''))
+        n = len(self.docs)
+        query = self._normalise({
+            term: weight * (math.log((n + 1) / (self.document_frequency(term) + 1)) + 1)
+            for term, weight in self._log_tf(commission.get('skills', '')).items()
+        })
+
+        scores = defaultdict(float)
+        shared = defaultdict(list)
+        for commission_type in COUNTERPART_TYPES.get(commission['commission_type'], ()):
+            postings = self.postings.get(commission_type, {})
+            for term, query_weight in query.items():
+                for candidate, weight in postings.get(term, {}).items():
+                    scores[candidate] += query_weight * weight
+                    shared[candidate].append(term)
+        scores.pop(commission['id'], None)
+        best = heapq.nlargest(k, (
+            (score, candidate) for candidate, score in scores.items()
+            if not creator_id or self.docs[candidate]['creator_id'] != creator_id
+        ))
+        return [(score, candidate, shared[candidate]) for score, candidate in best]
+
+    async def load(self, source=SKILL_INDEX_SOURCE):
+        """Seed the index from the backend's list of approved commissions"""
+        if not source:
+            return
+        cursor, number = None, 1
+        try:
+            while True:
+                page = await fetch_page(source, 'commissions', cursor=cursor, number=number, limit=100,
+                                        fields=FIELD_SETS['skill_index'])
+                if page is None:
+                    log.info("Skill index source %s unavailable; indexing approvals as they arrive", source)
+                    return
+                for commission in page.items:
+                    self.update(commission)
+                    # Also seeds deadlines on a cold start, before any event has been seen
+                    expiry_scheduler.track(commission, shared=True)
+                if page.next_cursor is None:
+                    break
+                cursor, number = page.next_cursor, number + 1
+        except Exception as e:
+            log.warning("Error loading skill index: %s", e)
+        log.info("Skill index loaded with %s commissions", len(self))
+
+    def __len__(self):
+        return len(self.docs)
+
+skill_index = SkillIndex()
+
+def render_matches(commission, matches, elapsed):
+    return build_embed(
+        f"🔎 Matches for Commission #{commission['id']}",
+        f"**{commission['commission_type']}** · {truncate(commission['skills'], 200)}",
+        fields=[MATCH_CARD.render(skill_index.docs[commission_id], id=commission_id, score=score,
+                                  shared=', '.join(shared[:5]))
+                for score, commission_id, shared in matches],
+        footer=f"{len(skill_index)} open commissions indexed · matched in {elapsed * 1000:.1f} ms"
     )
-    
-    await ctx.send(embed=embed)
 
 # Slash Commands
 @bot.slash_command(name="help", description="Get help with commission bot commands")
 async def help_slash(ctx):
     """Show help for commission commands"""
-    embed = discord.Embed(
-        title="🔧 Commission Bot Commands",
-        description="Slash commands for managing mercenary commissions",
-        color=0x7289DA
-    )
-    
-    embed.add_field(
-        name="👤 User Commands",
-        value="`/submit` - Start commission submission\n"
-              "`/mycommissions` - View your commissions\n"
-              "`/mystats` - View your stats\n"
-              "`/commission <id>` - View commission details\n"
-              "`/complete <id>` - Mark commission complete\n"
-              "`/report <id>` - Submit karma report\n"
-              "`/leaderboard` - View karma rankings",
-        inline=False
-    )
-    
-    embed.add_field(
-        name="🛡️ Admin Commands",
-        value="`/pending` - List pending commissions\n"
-              "`/approve <id>` - Approve commission\n"
-              "`/reject <id>` - Reject commission\n"
-              "`/reports` - View karma reports\n"
-              "`/set_admin_channel` - Set admin channel\n"
-              "`/set_public_channel` - Set public channel",
-        inline=False
-    )
-    
-    await ctx.respond(embed=embed, ephemeral=True)
+    await ctx.respond(embed=HELP_SLASH_EMBED, ephemeral=True)
 
 @bot.slash_command(name="submit", description="Start commission submission process via DM")
 async def submit_slash(ctx):
     """Start commission submission process via DM"""
-    try:
-        embed = discord.Embed(
-            title="📝 Commission Submission",
-            description="Let's create your commission request!\n\n"
-                       "Use the following format:\n"
-                       "`!commission <type> <skills>`\n\n"
-                       "**Types:**\n"
-                       "• `merc` - Merc for Hire\n"
-                       "• `team` - Merc Team for Hire\n"
-                       "• `task` - Task for a Merc Team\n\n"
-                       "**Example:**\n"
-                       "`!commission merc Python, Web Development, API Integration`",
-            color=0x7289DA
-        )
-        
-        await ctx.user.send(embed=embed)
+    if await notifier.send_dm(ctx.user, embed=SUBMIT_EMBED):
         await ctx.respond("✅ Check your DMs for commission submission instructions!", ephemeral=True)
-    except discord.Forbidden:
+    else:
         await ctx.respond("❌ I couldn't send you a DM. Please enable DMs from server members.", ephemeral=True)
 
 @bot.slash_command(name="mycommissions", description="View your commission history")
+@deferred()
 async def mycommissions_slash(ctx):
     """View your commission history"""
+    path = f'/api/users/{ctx.user.id}/commissions'
     try:
-        response = requests.get(f'{FLASK_SERVER_URL}/api/users/{ctx.user.id}/commissions', timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            commissions = data.get('commissions', [])
-            
-            if not commissions:
+        page = await fetch_page(path, 'commissions', cache_ttl=CACHE_TTLS['user_commissions'],
+                                fields=FIELD_SETS['user_commissions'])
+
+        if page is not None:
+            commission_index.seed(ctx.user.id, page.items)
+            if not page.items:
                 await ctx.respond("📋 You haven't created any commissions yet.", ephemeral=True)
                 return
-            
-            embed = discord.Embed(
-                title="📋 Your Commission History",
-                description=f"Found {len(commissions)} commissions",
-                color=0x7289DA
-            )
-            
-            for comm in commissions[:10]:  # Show last 10
-                status_emoji = {
-                    'pending': '⏳',
-                    'approved': '✅',
-                    'rejected': '❌',
-                    'accepted': '🤝',
-                    'completed': '✅',
-                    'expired': '⏰'
-                }.get(comm['status'], '❓')
-                
-                embed.add_field(
-                    name=f"{status_emoji} Commission #{comm['id']}",
-                    value=f"**Type:** {comm['commission_type']}\n"
-                          f"**Status:** {comm['status'].title()}\n"
-                          f"**Skills:** {comm['skills'][:50]}{'...' if len(comm['skills']) > 50 else ''}",
-                    inline=True
-                )
-            
-            await ctx.respond(embed=embed, ephemeral=True)
+
+            await respond_paginated(ctx, page, path, 'commissions', render_user_commissions,
+                                    cache_ttl=CACHE_TTLS['user_commissions'], fields=FIELD_SETS['user_commissions'])
         else:
+            record_command_error(ctx, None)
             await ctx.respond("❌ Error fetching your commissions. Try again later.", ephemeral=True)
     except Exception as e:
-        print(f"Error in mycommissions: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in mycommissions: %s", e)
         await ctx.respond("❌ Connection error. Please try again later.", ephemeral=True)
 
 @bot.slash_command(name="commission", description="View detailed information about a commission")
-async def commission_slash(ctx, commission_id: int):
+@deferred(ephemeral=False)
+async def commission_slash(ctx, commission_id: discord.Option(int, "Commission ID",
+                                                              autocomplete=commission_autocomplete())):
     """View detailed information about a commission"""
     try:
-        response = requests.get(f'{FLASK_SERVER_URL}/api/commissions/{commission_id}', timeout=10)
+        response = await backend.get(f'/api/commissions/{commission_id}', cache_ttl=CACHE_TTLS['commission'])
         
         if response.status_code == 200:
             data = response.json()
             comm = data['commission']
-            
-            embed = discord.Embed(
-                title=f"📋 Commission #{comm['id']}",
-                description=f"**Type:** {comm['commission_type']}",
-                color=0x7289DA
-            )
-            
-            embed.add_field(name="Skills Required", value=comm['skills'], inline=False)
-            embed.add_field(name="Status", value=comm['status'].title(), inline=True)
-            embed.add_field(name="Creator", value=f"<@{comm['user']['discord_id']}>", inline=True)
-            
-            if comm.get('accepter'):
-                embed.add_field(name="Accepter", value=f"<@{comm['accepter']['discord_id']}>", inline=True)
-            
-            embed.add_field(name="Created", value=comm['created_at'][:19], inline=True)
-            
-            if comm.get('expires_at'):
-                embed.add_field(name="Expires", value=comm['expires_at'][:19], inline=True)
-            
-            await ctx.respond(embed=embed)
+            commission_index.update(comm)
+            expiry_scheduler.track(comm)
+
+            await ctx.respond(embed=commission_detail_embed(comm))
         else:
+            record_command_error(ctx, response)
             await ctx.respond("❌ Commission not found.", ephemeral=True)
     except Exception as e:
-        print(f"Error in commission: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in commission: %s", e)
         await ctx.respond("❌ Error fetching commission details.", ephemeral=True)
 
+@bot.slash_command(name="match", description="Find open commissions that fit a commission's skills")
+@deferred()
+async def match_slash(ctx,
+                      commission_id: discord.Option(int, "Commission ID",
+                                                    autocomplete=commission_autocomplete('approved')),
+                      results: discord.Option(int, "Number of matches", min_value=1, max_value=10,
+                                              default=MATCH_RESULTS)):
+    """Find open commissions that fit a commission's skills"""
+    try:
+        response = await backend.get(f'/api/commissions/{commission_id}', cache_ttl=CACHE_TTLS['commission'])
+        if response.status_code != 200:
+            record_command_error(ctx, response)
+            await ctx.respond("❌ Commission not found.", ephemeral=True)
+            return
+
+        comm = response.json()['commission']
+        if comm['commission_type'] not in COUNTERPART_TYPES:
+            await ctx.respond("❌ This commission type has no counterparts to match.", ephemeral=True)
+            return
+        skill_index.update(comm)
+
+        started = time.perf_counter()
+        matches = skill_index.match(comm, results)
+        elapsed = time.perf_counter() - started
+        if not matches:
+            await ctx.respond(f"🔎 No open commissions match #{commission_id} yet.", ephemeral=True)
+            return
+        await ctx.respond(embed=render_matches(comm, matches, elapsed), ephemeral=True)
+    except Exception as e:
+        record_command_error(ctx, e)
+        log.error("Error in match: %s", e)
+        await ctx.respond("❌ Error finding matches.", ephemeral=True)
+
 @bot.slash_command(name="complete", description="Mark a commission as completed")
-async def complete_slash(ctx, commission_id: int, documentation: str = "No documentation provided"):
+@deferred()
+async def complete_slash(ctx,
+                         commission_id: discord.Option(int, "Commission ID",
+                                                       autocomplete=commission_autocomplete('accepted')),
+                         documentation: str = "No documentation provided"):
     """Mark a commission as completed"""
+    payload = {
+        'discord_id': str(ctx.user.id),
+        'username': ctx.user.name,
+        'documentation': documentation
+    }
+    key = idempotency_key(ctx, 'complete_commission')
     try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/commissions/{commission_id}/complete',
-            json={
-                'discord_id': str(ctx.user.id),
-                'username': ctx.user.name,
-                'documentation': documentation
-            },
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
-        )
-        
+        response = await post_or_queue(f'/api/commissions/{commission_id}/complete', payload, key, ctx.user.id,
+                                       {'commission_id': commission_id})
+        if response is None:
+            await ctx.respond("📥 The commission system is unreachable right now, so your completion has been queued. "
+                              "You'll get a DM once it's processed.", ephemeral=True)
+            return
+
         if response.status_code == 200:
             data = response.json()
+            invalidate_commission(commission_id)
+            invalidate_karma()
+            commission_index.set_status(commission_id, 'completed')
+            skill_index.remove(commission_id)
+            expiry_scheduler.discard(commission_id)
             await ctx.respond(f"✅ {data['message']}", ephemeral=True)
         else:
+            record_command_error(ctx, response)
             error_data = response.json()
             await ctx.respond(f"❌ {error_data.get('error', 'Unknown error')}", ephemeral=True)
     except Exception as e:
-        print(f"Error in complete: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in complete: %s", e)
         await ctx.respond("❌ Error marking commission complete.", ephemeral=True)
 
 @bot.slash_command(name="pending", description="List all pending commissions (Admin only)")
+@admin_only
+@deferred()
 async def pending_slash(ctx):
     """List all pending commissions (Admin only)"""
-    # Check if user has admin role
-    if not any(role.name.lower() == ADMIN_ROLE_NAME.lower() for role in ctx.user.roles):
-        await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
-        return
-    
     try:
-        response = requests.get(f'{FLASK_SERVER_URL}/api/commissions/pending', timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            commissions = data.get('commissions', [])
-            
-            if not commissions:
+        page = await fetch_page('/api/commissions/pending', 'commissions', fields=FIELD_SETS['pending_commissions'])
+
+        if page is not None:
+            if not page.items:
                 await ctx.respond("📋 No pending commissions.", ephemeral=True)
                 return
-            
-            embed = discord.Embed(
-                title="⏳ Pending Commissions",
-                description=f"Found {len(commissions)} pending approval",
-                color=0xFFAA00
-            )
-            
-            for comm in commissions[:10]:
-                embed.add_field(
-                    name=f"Commission #{comm['id']}",
-                    value=f"**Type:** {comm['commission_type']}\n"
-                          f"**Creator:** <@{comm['user']['discord_id']}>\n"
-                          f"**Skills:** {comm['skills'][:100]}{'...' if len(comm['skills']) > 100 else ''}\n"
-                          f"**Created:** {comm['created_at'][:19]}",
-                    inline=False
-                )
-            
-            await ctx.respond(embed=embed, ephemeral=True)
+
+            view = PendingModerationView(ctx.user, page)
+            await ctx.respond(embed=render_pending_commissions(page), view=view, ephemeral=True)
         else:
+            record_command_error(ctx, None)
             await ctx.respond("❌ Error fetching pending commissions.", ephemeral=True)
     except Exception as e:
-        print(f"Error in pending: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in pending: %s", e)
         await ctx.respond("❌ Connection error. Please try again later.", ephemeral=True)
 
 @bot.slash_command(name="approve", description="Approve a pending commission (Admin only)")
+@admin_only
+@deferred()
 async def approve_slash(ctx, commission_id: int):
     """Approve a pending commission (Admin only)"""
-    # Check if user has admin role
-    if not any(role.name.lower() == ADMIN_ROLE_NAME.lower() for role in ctx.user.roles):
-        await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
-        return
-    
     try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/commissions/{commission_id}/approve',
-            json={'admin_id': str(ctx.user.id), 'admin_name': ctx.user.display_name},
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
+        response = await backend.post(f'/api/commissions/{commission_id}/approve',
+            json={'admin_id': str(ctx.user.id), 'admin_name': ctx.user.display_name}
         )
         
         if response.status_code == 200:
             data = response.json()
+            invalidate_commission(commission_id)
             await ctx.respond(f"✅ {data['message']}", ephemeral=True)
+            await refresh_commission(commission_id)
         else:
+            record_command_error(ctx, response)
             error_data = response.json()
             await ctx.respond(f"❌ {error_data.get('error', 'Unknown error')}", ephemeral=True)
     except Exception as e:
-        print(f"Error in approve: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in approve: %s", e)
         await ctx.respond("❌ Error approving commission.", ephemeral=True)
 
 @bot.slash_command(name="reject", description="Reject a pending commission (Admin only)")
+@admin_only
+@deferred()
 async def reject_slash(ctx, commission_id: int, reason: str = "No reason provided"):
     """Reject a pending commission (Admin only)"""
-    # Check if user has admin role
-    if not any(role.name.lower() == ADMIN_ROLE_NAME.lower() for role in ctx.user.roles):
-        await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
-        return
-    
     try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/commissions/{commission_id}/reject',
-            json={'admin_id': str(ctx.user.id), 'reason': reason},
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
+        response = await backend.post(f'/api/commissions/{commission_id}/reject',
+            json={'admin_id': str(ctx.user.id), 'reason': reason}
         )
         
         if response.status_code == 200:
             data = response.json()
+            invalidate_commission(commission_id)
             await ctx.respond(f"✅ {data['message']}", ephemeral=True)
         else:
+            record_command_error(ctx, response)
             error_data = response.json()
             await ctx.respond(f"❌ {error_data.get('error', 'Unknown error')}", ephemeral=True)
     except Exception as e:
-        print(f"Error in reject: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in reject: %s", e)
         await ctx.respond("❌ Error rejecting commission.", ephemeral=True)
 
+@bot.slash_command(name="bulk_approve", description="Approve several pending commissions at once (Admin only)")
+@admin_only
+@deferred()
+async def bulk_approve_slash(ctx, commission_ids: str):
+    """Approve a list or range of commissions, e.g. `12, 15-20` (Admin only)"""
+    try:
+        ids = parse_commission_ids(commission_ids)
+    except ValueError as e:
+        await ctx.respond(f"❌ {e}. Use IDs and ranges like `12, 15-20`.", ephemeral=True)
+        return
+
+    try:
+        response = await moderate_commissions('approve', ids, ctx.user)
+        if response.status_code != 200:
+            record_command_error(ctx, response)
+        await ctx.respond(format_bulk_results('approve', response), ephemeral=True)
+        await apply_bulk_results('approve', response)
+    except Exception as e:
+        record_command_error(ctx, e)
+        log.error("Error in bulk_approve: %s", e)
+        await ctx.respond("❌ Error approving commissions.", ephemeral=True)
+
+@bot.slash_command(name="bulk_reject", description="Reject several pending commissions at once (Admin only)")
+@admin_only
+@deferred()
+async def bulk_reject_slash(ctx, commission_ids: str, reason: str = "No reason provided"):
+    """Reject a list or range of commissions, e.g. `12, 15-20` (Admin only)"""
+    try:
+        ids = parse_commission_ids(commission_ids)
+    except ValueError as e:
+        await ctx.respond(f"❌ {e}. Use IDs and ranges like `12, 15-20`.", ephemeral=True)
+        return
+
+    try:
+        response = await moderate_commissions('reject', ids, ctx.user, reason=reason)
+        if response.status_code != 200:
+            record_command_error(ctx, response)
+        await ctx.respond(format_bulk_results('reject', response), ephemeral=True)
+        await apply_bulk_results('reject', response)
+    except Exception as e:
+        record_command_error(ctx, e)
+        log.error("Error in bulk_reject: %s", e)
+        await ctx.respond("❌ Error rejecting commissions.", ephemeral=True)
+
 @bot.slash_command(name="mystats", description="View your stats")
+@deferred()
 async def mystats_slash(ctx):
     """View your stats"""
     try:
-        response = requests.get(f'{FLASK_SERVER_URL}/api/users/{ctx.user.id}/stats', timeout=10)
+        response = await backend.get(f'/api/users/{ctx.user.id}/stats', cache_ttl=CACHE_TTLS['user_stats'])
         
         if response.status_code == 200:
             data = response.json()
             stats = data['stats']
             
-            embed = discord.Embed(
-                title=f"📊 Stats for {ctx.user.display_name}",
-                color=0x00FF00
+            embed = build_embed(
+                f"📊 Stats for {ctx.user.display_name}",
+                color=0x00FF00,
+                fields=[(label, value_format.format(stats.get(key, default)), True)
+                        for label, value_format, key, default in STAT_FIELDS]
             )
-            
-            embed.add_field(name="Total Commissions", value=stats.get('total_commissions', 0), inline=True)
-            embed.add_field(name="Completed", value=stats.get('completed_commissions', 0), inline=True) 
-            embed.add_field(name="Success Rate", value=f"{stats.get('success_rate', 0):.1f}%", inline=True)
-            embed.add_field(name="Average Rating", value=f"{stats.get('average_rating', 0):.1f}/5", inline=True)
-            embed.add_field(name="Karma Points", value=stats.get('karma_points', 0), inline=True)
-            embed.add_field(name="Rank", value=f"#{stats.get('rank', 'N/A')}", inline=True)
-            
+
             await ctx.respond(embed=embed, ephemeral=True)
         else:
+            record_command_error(ctx, response)
             await ctx.respond("❌ Error fetching your stats.", ephemeral=True)
     except Exception as e:
-        print(f"Error in mystats: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in mystats: %s", e)
         await ctx.respond("❌ Connection error. Please try again later.", ephemeral=True)
 
 @bot.slash_command(name="leaderboard", description="View the karma leaderboard")
+@deferred(ephemeral=False)
 async def leaderboard_slash(ctx):
     """View the karma leaderboard"""
     try:
-        response = requests.get(f'{FLASK_SERVER_URL}/api/leaderboard', timeout=10)
+        response = await backend.get('/api/leaderboard', cache_ttl=CACHE_TTLS['leaderboard'],
+                                     fields=FIELD_SETS['leaderboard'])
         
         if response.status_code == 200:
             data = response.json()
@@ -479,173 +2342,730 @@ async def leaderboard_slash(ctx):
                 await ctx.respond("📊 No leaderboard data available yet.", ephemeral=True)
                 return
             
-            embed = discord.Embed(
-                title="🏆 Karma Leaderboard",
-                description="Top mercenaries by karma points",
-                color=0xFFD700
+            embed = build_embed(
+                "🏆 Karma Leaderboard",
+                "Top mercenaries by karma points",
+                color=0xFFD700,
+                fields=[LEADERBOARD_CARD.render(user, rank=RANK_EMOJI.get(i, f"{i}."),
+                                                name=user['display_name'] or user['username'])
+                        for i, user in enumerate(leaderboard[:10], 1)]
             )
-            
-            for i, user in enumerate(leaderboard[:10], 1):
-                rank_emoji = "🥇" if i == 1 else "🥈" if i == 2 else "🥉" if i == 3 else f"{i}."
-                embed.add_field(
-                    name=f"{rank_emoji} {user['display_name'] or user['username']}",
-                    value=f"**Karma:** {user['karma_points']}\n"
-                          f"**Completed:** {user['completed_commissions']}\n"
-                          f"**Rating:** {user['average_rating']:.1f}/5",
-                    inline=True
-                )
-            
+
             await ctx.respond(embed=embed)
         else:
+            record_command_error(ctx, response)
             await ctx.respond("❌ Error fetching leaderboard.", ephemeral=True)
     except Exception as e:
-        print(f"Error in leaderboard: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in leaderboard: %s", e)
         await ctx.respond("❌ Connection error. Please try again later.", ephemeral=True)
 
 @bot.slash_command(name="report", description="Submit a karma report for a completed commission")
-async def report_slash(ctx, commission_id: int, report_type: str, reason: str):
+@deferred()
+async def report_slash(ctx,
+                       commission_id: discord.Option(int, "Commission ID",
+                                                     autocomplete=commission_autocomplete('completed')),
+                       report_type: str, reason: str):
     """Submit a karma report for a completed commission"""
     if report_type.lower() not in ['positive', 'negative']:
         await ctx.respond("❌ Report type must be 'positive' or 'negative'.", ephemeral=True)
         return
     
+    payload = {
+        'reporter_id': str(ctx.user.id),
+        'reporter_name': ctx.user.display_name,
+        'report_type': report_type.lower(),
+        'reason': reason
+    }
+    key = idempotency_key(ctx, 'report_commission')
     try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/commissions/{commission_id}/report',
-            json={
-                'reporter_id': str(ctx.user.id),
-                'reporter_name': ctx.user.display_name,
-                'report_type': report_type.lower(),
-                'reason': reason
-            },
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
-        )
-        
+        response = await post_or_queue(f'/api/commissions/{commission_id}/report', payload, key, ctx.user.id,
+                                       {'commission_id': commission_id})
+        if response is None:
+            await ctx.respond("📥 The commission system is unreachable right now, so your report has been queued. "
+                              "You'll get a DM once it's processed.", ephemeral=True)
+            return
+
         if response.status_code == 201:
             data = response.json()
+            invalidate_commission(commission_id)
+            invalidate_karma()
             await ctx.respond(f"✅ {data['message']}", ephemeral=True)
         else:
+            record_command_error(ctx, response)
             error_data = response.json()
             await ctx.respond(f"❌ {error_data.get('error', 'Unknown error')}", ephemeral=True)
     except Exception as e:
-        print(f"Error in report: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in report: %s", e)
         await ctx.respond("❌ Error submitting report.", ephemeral=True)
 
 @bot.slash_command(name="reports", description="List pending karma reports (Admin only)")
+@admin_only
+@deferred()
 async def reports_slash(ctx):
     """List pending karma reports (Admin only)"""
-    # Check if user has admin role
-    if not any(role.name.lower() == ADMIN_ROLE_NAME.lower() for role in ctx.user.roles):
-        await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
-        return
-    
     try:
-        response = requests.get(f'{FLASK_SERVER_URL}/api/reports/pending', timeout=10)
-        
-        if response.status_code == 200:
-            data = response.json()
-            reports = data.get('reports', [])
-            
-            if not reports:
+        page = await fetch_page('/api/reports/pending', 'reports', fields=FIELD_SETS['pending_reports'])
+
+        if page is not None:
+            if not page.items:
                 await ctx.respond("📋 No pending karma reports.", ephemeral=True)
                 return
-            
-            embed = discord.Embed(
-                title="📋 Pending Karma Reports",
-                description=f"Found {len(reports)} pending reports",
-                color=0xFFAA00
-            )
-            
-            for report in reports[:10]:
-                report_emoji = "👍" if report['report_type'] == 'positive' else "👎"
-                embed.add_field(
-                    name=f"{report_emoji} Report #{report['id']}",
-                    value=f"**Commission:** #{report['commission_id']}\n"
-                          f"**Reporter:** <@{report['reporter_id']}>\n"
-                          f"**Type:** {report['report_type'].title()}\n"
-                          f"**Reason:** {report['reason'][:100]}{'...' if len(report['reason']) > 100 else ''}",
-                    inline=False
-                )
-            
-            await ctx.respond(embed=embed, ephemeral=True)
+
+            await respond_paginated(ctx, page, '/api/reports/pending', 'reports', render_pending_reports,
+                                    fields=FIELD_SETS['pending_reports'])
         else:
+            record_command_error(ctx, None)
             await ctx.respond("❌ Error fetching reports.", ephemeral=True)
     except Exception as e:
-        print(f"Error in reports: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in reports: %s", e)
         await ctx.respond("❌ Connection error. Please try again later.", ephemeral=True)
 
 @bot.slash_command(name="set_admin_channel", description="Set the admin approval channel (Admin only)")
+@admin_only
+@deferred()
 async def set_admin_channel_slash(ctx, channel: discord.TextChannel):
     """Set the admin approval channel (Admin only)"""
-    # Check if user has admin role
-    if not any(role.name.lower() == ADMIN_ROLE_NAME.lower() for role in ctx.user.roles):
-        await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
-        return
-    
     try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/settings/admin_channel',
-            json={'channel_id': str(channel.id), 'admin_id': str(ctx.user.id)},
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
+        response = await backend.post('/api/settings/admin_channel',
+            json={'channel_id': str(channel.id), 'admin_id': str(ctx.user.id)}
         )
         
         if response.status_code == 200:
             await ctx.respond(f"✅ Admin approval channel set to {channel.mention}", ephemeral=True)
         else:
+            record_command_error(ctx, response)
             await ctx.respond("❌ Error setting admin channel.", ephemeral=True)
     except Exception as e:
-        print(f"Error in set_admin_channel: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in set_admin_channel: %s", e)
         await ctx.respond("❌ Error setting admin channel.", ephemeral=True)
 
 @bot.slash_command(name="set_public_channel", description="Set the public commission channel (Admin only)")
+@admin_only
+@deferred()
 async def set_public_channel_slash(ctx, channel: discord.TextChannel):
     """Set the public commission channel (Admin only)"""
-    # Check if user has admin role
-    if not any(role.name.lower() == ADMIN_ROLE_NAME.lower() for role in ctx.user.roles):
-        await ctx.respond("❌ This command requires admin permissions.", ephemeral=True)
-        return
-    
     try:
-        response = requests.post(f'{FLASK_SERVER_URL}/api/settings/public_channel',
-            json={'channel_id': str(channel.id), 'admin_id': str(ctx.user.id)},
-            timeout=10,
-            headers={'Content-Type': 'application/json'}
+        response = await backend.post('/api/settings/public_channel',
+            json={'channel_id': str(channel.id), 'admin_id': str(ctx.user.id)}
         )
         
         if response.status_code == 200:
             await ctx.respond(f"✅ Public commission channel set to {channel.mention}", ephemeral=True)
         else:
+            record_command_error(ctx, response)
             await ctx.respond("❌ Error setting public channel.", ephemeral=True)
     except Exception as e:
-        print(f"Error in set_public_channel: {e}")
+        record_command_error(ctx, e)
+        log.error("Error in set_public_channel: %s", e)
         await ctx.respond("❌ Error setting public channel.", ephemeral=True)
 
+# Local commission state
+def apply_commission(commission, shared=False):
+    """Bring the local indexes in line with a full commission record.
+
+    `shared` marks records every shard worker receives, such as pushed events.
+    """
+    commission_index.update(commission)
+    skill_index.update(commission)
+    expiry_scheduler.track(commission, shared=shared)
+
+async def refresh_commission(commission_id):
+    """Re-read a commission the bot just changed and apply it locally"""
+    try:
+        response = await backend.get(f'/api/commissions/{commission_id}')
+        if response.status_code == 200:
+            apply_commission(response.json()['commission'])
+    except Exception as e:
+        log.warning("Error refreshing commission #%s: %s", commission_id, e)
+
+async def apply_bulk_results(action, response):
+    """Apply the successful items of a bulk moderation request locally"""
+    if response.status_code != 200:
+        return
+    refresh = []
+    for result in response.json().get('results', []):
+        if not result.get('success'):
+            continue
+        if result.get('commission'):
+            apply_commission(result['commission'])
+        elif action == 'approve':
+            refresh.append(refresh_commission(result['id']))
+        else:
+            expiry_scheduler.discard(result['id'])
+    await asyncio.gather(*refresh)
+
+# Backend events
+# DM sent to the commission creator for each pushed event type
+EVENT_DM_TEMPLATES = {
+    'commission.approved': "✅ Your commission #{id} has been approved and is now public.",
+    'commission.rejected': "❌ Your commission #{id} was rejected. Reason: {reason}",
+    'commission.accepted': "🤝 Your commission #{id} has been accepted by <@{accepter_id}>.",
+    'commission.completed': "🏁 Commission #{id} has been marked as completed.",
+    'commission.expired': "⏰ Your commission #{id} has expired."
+}
+
+_seen_event_ids = OrderedDict()
+# Events being handled right now, so a concurrent redelivery is skipped too
+_handling_event_ids = set()
+
+# Fields of a pushed commission that the caches, embeds and DMs read
+EVENT_COMMISSION_FIELDS = ('id', 'commission_type', 'status', 'skills', 'user')
+
+def valid_event(event):
+    """Whether a pushed event has the shape handle_backend_event relies on.
+
+    Its commission is cached as the full detail record, so partial records
+    are rejected rather than served to /commission later.
+    """
+    if not isinstance(event, dict):
+        return False
+    commission = event.get('commission')
+    if commission is None:
+        return True
+    if not isinstance(commission, dict) or any(commission.get(field) is None for field in EVENT_COMMISSION_FIELDS):
+        return False
+    accepter = commission.get('accepter')
+    return isinstance(commission['user'], dict) and 'discord_id' in commission['user'] and \
+        (not accepter or (isinstance(accepter, dict) and 'discord_id' in accepter))
+
+async def handle_backend_event(event):
+    """Apply one pushed backend event to the local caches and send its notifications.
+
+    An event ID counts as seen only once it has been handled, so a redelivery
+    after a failure is processed again.
+    """
+    event_id = event.get('id')
+    if event_id is not None:
+        if event_id in _seen_event_ids or event_id in _handling_event_ids:
+            return
+        _handling_event_ids.add(event_id)
+    try:
+        await _apply_backend_event(event)
+    finally:
+        _handling_event_ids.discard(event_id)
+    if event_id is not None:
+        _seen_event_ids[event_id] = True
+        if len(_seen_event_ids) > 1000:
+            _seen_event_ids.popitem(last=False)
+
+async def _apply_backend_event(event):
+    kind = event.get('type', '')
+    commission = event.get('commission')
+    if commission:
+        invalidate_commission(commission['id'])
+        apply_commission(commission, shared=True)
+        # The event carries the new state, so the detail view can be served locally
+        backend.cache.set(f"/api/commissions/{commission['id']}",
+                          BackendResponse(200, json.dumps({'commission': commission})),
+                          CACHE_TTLS['commission'])
+    if kind in ('commission.completed', 'report.created', 'report.resolved'):
+        invalidate_karma()
+
+    if commission and kind in EVENT_DM_TEMPLATES and PRIMARY_PROCESS and \
+            not (kind == 'commission.expired' and expiry_scheduler.notified_expired(commission['id'])):
+        notify_commission_creator(kind, commission, event)
+    if commission and kind == 'commission.approved' and COMMISSION_CHANNEL_ID:
+        await announce_commission(commission)
+
+def notify_commission_creator(kind, commission, event):
+    message = EVENT_DM_TEMPLATES[kind].format(
+        id=commission['id'],
+        reason=event.get('reason') or 'No reason provided',
+        accepter_id=(commission.get('accepter') or {}).get('discord_id', '')
+    )
+    if not notifier.enqueue(int(commission['user']['discord_id']), content=message):
+        log.warning("Notification queue full; dropped DM for commission #%s", commission['id'])
+
+async def announce_commission(commission):
+    channel = bot.get_channel(COMMISSION_CHANNEL_ID)
+    if channel is None:
+        return
+    embed = build_embed(
+        f"📢 Commission #{commission['id']}",
+        f"**Type:** {commission['commission_type']}",
+        color=0x00FF00,
+        fields=[("Skills Required", commission['skills'], False),
+                ("Creator", f"<@{commission['user']['discord_id']}>", True)],
+        footer=f"Use !accept {commission['id']} to take this commission"
+    )
+    try:
+        await channel.send(embed=embed)
+    except Exception as e:
+        log.error("Error announcing commission #%s: %s", commission['id'], e)
+
+# Expiry reminders
+def parse_timestamp(value):
+    """Parse a backend ISO timestamp (naive values are UTC) into epoch seconds"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+class ExpiryScheduler:
+    """Min-heap of commission deadlines that sends batched reminder and expiry DMs.
+
+    Deadlines are learned from commission records the bot already sees
+    (events, /commission, its own status changes, the approved list at
+    startup) and persisted in SQLite, so a restart reloads them without
+    rescanning the backend. The task sleeps until the earliest deadline;
+    superseded heap entries are skipped when popped, and due commissions
+    are re-read before notifying in case they changed unseen.
+
+    With several shard workers, deadlines every worker learns (events, the
+    startup list) are notified by the primary one only; a deadline a worker
+    learned from its own commands is notified by that worker.
+    """
+
+    def __init__(self, path=EXPIRY_DB_PATH, remind_before=EXPIRY_REMINDER_BEFORE, window=EXPIRY_BATCH_WINDOW):
+        self.path = path
+        self.remind_before = remind_before
+        self.window = window
+        self.deadlines = {}
+        self.sent = 0
+        self._heap = []
+        self._expired = OrderedDict()
+        self._wakeup = None
+        self._db = None
+        # One writer thread keeps persisted changes in the order they were made
+        self._writer = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix='deadlines')
+
+    def _connect(self):
+        if self._db is None:
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            db.execute('PRAGMA journal_mode=WAL')
+            db.execute(
+                'CREATE TABLE IF NOT EXISTS deadlines ('
+                ' commission_id INTEGER PRIMARY KEY,'
+                ' expires_at REAL NOT NULL,'
+                ' recipients TEXT NOT NULL,'
+                ' reminded INTEGER NOT NULL DEFAULT 0,'
+                ' owned INTEGER NOT NULL DEFAULT 0)'
+            )
+            try:
+                db.execute('ALTER TABLE deadlines ADD COLUMN owned INTEGER NOT NULL DEFAULT 0')
+            except sqlite3.OperationalError:
+                # Created with the column, or already migrated
+                pass
+            self._db = db
+        return self._db
+
+    def _load_rows(self):
+        return self._connect().execute(
+            'SELECT commission_id, expires_at, recipients, reminded, owned FROM deadlines').fetchall()
+
+    def _persist(self, sql, params):
+        # Fire and forget; the in-memory heap is authoritative while running
+        self._writer.submit(lambda: self._connect().execute(sql, params))
+
+    def _push(self, commission_id, deadline):
+        for kind, when in (('reminder', deadline['expires_at'] - self.remind_before),
+                           ('expiry', deadline['expires_at'])):
+            if kind == 'reminder' and deadline['reminded']:
+                continue
+            heapq.heappush(self._heap, (when, commission_id, kind, deadline['expires_at']))
+            if self._heap[0][1] == commission_id and self._wakeup is not None:
+                self._wakeup.set()
+
+    def discard(self, commission_id):
+        """Stop tracking a commission's deadline"""
+        if self.deadlines.pop(commission_id, None) is not None:
+            self._persist('DELETE FROM deadlines WHERE commission_id = ?', (commission_id,))
+
+    def track(self, commission, shared=False):
+        """Schedule an open commission's deadline, or drop it once the commission is closed.
+
+        `shared` is for records every shard worker sees; other deadlines are
+        owned, and notified, by the worker that learned them.
+        """
+        commission_id = commission['id']
+        if commission.get('status') not in ('approved', 'accepted') or not commission.get('expires_at'):
+            self.discard(commission_id)
+            return
+        expires_at = parse_timestamp(commission['expires_at'])
+        recipients = sorted({int(party['discord_id']) for party in (commission.get('user'), commission.get('accepter'))
+                             if party and party.get('discord_id')})
+        current = self.deadlines.get(commission_id)
+        # Once the primary worker has seen a deadline too, it alone sends the DMs
+        owned = not shared and (current is None or current['owned'])
+        if current and current['expires_at'] == expires_at and current['recipients'] == recipients \
+                and current['owned'] == owned:
+            return
+        deadline = {'expires_at': expires_at, 'recipients': recipients, 'owned': owned,
+                    'reminded': bool(current and current['reminded'] and current['expires_at'] == expires_at)}
+        self.deadlines[commission_id] = deadline
+        self._persist('INSERT OR REPLACE INTO deadlines (commission_id, expires_at, recipients, reminded, owned)'
+                      ' VALUES (?, ?, ?, ?, ?)',
+                      (commission_id, expires_at, json.dumps(recipients), int(deadline['reminded']), int(owned)))
+        if not current or current['expires_at'] != expires_at:
+            self._push(commission_id, deadline)
+
+    def notified_expired(self, commission_id):
+        return commission_id in self._expired
+
+    def _pop_due(self, now):
+        """Pop every live entry that is due"""
+        due = {}
+        while self._heap and self._heap[0][0] <= now:
+            when, commission_id, kind, expires_at = heapq.heappop(self._heap)
+            deadline = self.deadlines.get(commission_id)
+            if deadline is None or deadline['expires_at'] != expires_at or \
+                    (kind == 'reminder' and deadline['reminded']):
+                continue
+            due[kind, commission_id] = deadline
+        return [(kind, commission_id, deadline) for (kind, commission_id), deadline in due.items()]
+
+    async def _current(self, commission_id):
+        try:
+            response = await backend.get(f'/api/commissions/{commission_id}')
+            if response.status_code == 200:
+                return response.json()['commission']
+        except Exception as e:
+            log.warning("Error re-reading commission #%s: %s", commission_id, e)
+        return None
+
+    async def _confirm(self, due):
+        """Drop due entries whose commission was closed or extended without the bot seeing it"""
+        ids = list({commission_id for _, commission_id, _ in due})
+        current = dict(zip(ids, await asyncio.gather(*(self._current(commission_id) for commission_id in ids))))
+        confirmed = []
+        for kind, commission_id, deadline in due:
+            commission = current[commission_id]
+            # Notify anyway when the backend can't say otherwise
+            if commission is None or commission.get('status') == 'expired' or (
+                    commission.get('status') in ('approved', 'accepted') and commission.get('expires_at')
+                    and parse_timestamp(commission['expires_at']) == deadline['expires_at']):
+                confirmed.append((kind, commission_id, deadline))
+            else:
+                self.track(commission, shared=not deadline['owned'])
+        return confirmed
+
+    def _notify(self, due, now):
+        reminders = defaultdict(list)
+        expired = defaultdict(list)
+        for kind, commission_id, deadline in due:
+            if self.deadlines.get(commission_id) is not deadline:
+                # Changed while the batch was being confirmed
+                continue
+            # Other shard workers only keep their caches in step for deadlines they did not learn themselves
+            recipients = deadline['recipients'] if PRIMARY_PROCESS or deadline['owned'] else ()
+            if kind == 'reminder' and deadline['expires_at'] > now:
+                deadline['reminded'] = True
+                self._persist('UPDATE deadlines SET reminded = 1 WHERE commission_id = ?', (commission_id,))
+                remaining = deadline['expires_at'] - now
+                left = f"{round(remaining / 3600)}h" if remaining >= 5400 else f"{max(1, round(remaining / 60))} min"
+                for user_id in recipients:
+                    reminders[user_id].append(f"#{commission_id} (in ~{left})")
+            elif kind == 'expiry':
+                del self.deadlines[commission_id]
+                self._persist('DELETE FROM deadlines WHERE commission_id = ?', (commission_id,))
+                self._expired[commission_id] = True
+                if len(self._expired) > 1000:
+                    self._expired.popitem(last=False)
+                invalidate_commission(commission_id)
+                commission_index.set_status(commission_id, 'expired')
+                skill_index.remove(commission_id)
+                for user_id in recipients:
+                    expired[user_id].append(f"#{commission_id}")
+
+        for user_id in reminders.keys() | expired.keys():
+            lines = []
+            if reminders[user_id]:
+                lines.append(f"⏳ Expiring soon: {', '.join(reminders[user_id])}")
+            if expired[user_id]:
+                lines.append(f"⏰ Expired: {', '.join(expired[user_id])}")
+            if notifier.enqueue(user_id, content='\n'.join(lines)):
+                self.sent += 1
+            else:
+                log.warning("Notification queue full; dropped expiry DM for user %s", user_id)
+
+    async def run(self):
+        """Reload persisted deadlines, then sleep until each batch is due"""
+        self._wakeup = asyncio.Event()
+        rows = await asyncio.get_running_loop().run_in_executor(self._writer, self._load_rows)
+        for commission_id, expires_at, recipients, reminded, owned in rows:
+            if commission_id in self.deadlines:
+                # Already tracked from a fresher record since startup
+                continue
+            deadline = {'expires_at': expires_at, 'recipients': json.loads(recipients), 'reminded': bool(reminded),
+                        'owned': bool(owned)}
+            self.deadlines[commission_id] = deadline
+            self._push(commission_id, deadline)
+        log.info("Loaded %s commission deadlines", len(self.deadlines))
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] + self.window - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            now = time.time()
+            try:
+                due = self._pop_due(now)
+                if due:
+                    due = await self._confirm(due)
+                self._notify(due, time.time())
+            except Exception:
+                log.exception("Error sending expiry notifications")
+
+    def stats(self):
+        return {"tracked": len(self.deadlines), "scheduled": len(self._heap), "notifications_sent": self.sent}
+
+expiry_scheduler = ExpiryScheduler()
+
+# Status snapshot
+# Rebuilt on the bot loop and replaced as a whole, so web handlers on any
+# thread read a consistent dict without locking or touching bot state
+status_snapshot = {
+    "bot_ready": False,
+    "bot_user": None,
+    "guild_count": 0,
+    "gateway_latency": None,
+    "backend": backend.health.snapshot(),
+    "cache": backend.cache.stats(),
+    "coalesced_requests": 0,
+    "admin_denials": 0,
+    "inflight_commands": 0,
+    "startup": {},
+    "memory": {},
+    "shard_count": None,
+    "shards": [],
+    "outbox": outbox.stats(),
+    "expiry": expiry_scheduler.stats(),
+    "updated_at": None
+}
+
+def process_rss_bytes():
+    """Current resident set size, or the peak where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+def memory_snapshot():
+    # Runs every refresh: count the connection's caches directly, since
+    # guild.members and bot.users copy every cached object into a new list
+    guilds = bot._connection._guilds
+    return {
+        "lean_gateway": LEAN_GATEWAY,
+        "rss_bytes": process_rss_bytes(),
+        "cached_guilds": len(guilds),
+        "cached_members": sum(len(guild._members) for guild in guilds.values()),
+        "cached_users": len(bot._connection._users),
+        "cached_messages": len(bot.cached_messages),
+        "response_cache_entries": len(backend.cache),
+        "commission_index_entries": len(commission_index),
+        "skill_index_commissions": len(skill_index)
+    }
+
+def shard_snapshot():
+    """Readiness, latency and guild count for each shard this process runs"""
+    guild_counts = {}
+    for guild in bot.guilds:
+        guild_counts[guild.shard_id] = guild_counts.get(guild.shard_id, 0) + 1
+
+    if isinstance(bot, discord.AutoShardedClient):
+        shards = [(shard_id, not info.is_closed(), info.latency) for shard_id, info in bot.shards.items()]
+    else:
+        shards = [(bot.shard_id or 0, bot.is_ready(), bot.latency)]
+    return [
+        {
+            "shard_id": shard_id,
+            "connected": connected,
+            "latency": latency if math.isfinite(latency) else None,
+            "guild_count": guild_counts.get(shard_id, 0)
+        }
+        for shard_id, connected, latency in shards
+    ]
+
+def refresh_status_snapshot():
+    global status_snapshot
+    ready = bot.is_ready()
+    latency = bot.latency
+    status_snapshot = {
+        "bot_ready": ready,
+        "bot_user": str(bot.user) if bot.user else None,
+        "guild_count": len(bot.guilds) if ready else 0,
+        "gateway_latency": latency if math.isfinite(latency) else None,
+        "backend": backend.health.snapshot(),
+        "cache": backend.cache.stats(),
+        "coalesced_requests": backend.coalesced,
+        "admin_denials": admin_roles.denials,
+        "inflight_commands": len(command_tasks),
+        "startup": dict(startup_phases),
+        "memory": memory_snapshot(),
+        "shard_count": bot.shard_count,
+        "shards": shard_snapshot(),
+        "outbox": outbox.stats(),
+        "expiry": expiry_scheduler.stats(),
+        "updated_at": datetime.utcnow().isoformat()
+    }
+
+async def keep_status_snapshot_fresh(interval=STATUS_REFRESH_INTERVAL):
+    while True:
+        refresh_status_snapshot()
+        await asyncio.sleep(interval)
+
+def health_payload():
+    return {
+        "status": "healthy",
+        "bot_status": "connected" if status_snapshot["bot_ready"] else "connecting",
+        "timestamp": datetime.utcnow().isoformat()
+    }
+
+def status_payload():
+    snapshot = status_snapshot
+    return {key: snapshot[key] for key in ("bot_ready", "bot_user", "guild_count", "backend", "cache",
+                                           "coalesced_requests", "admin_denials", "inflight_commands",
+                                           "startup", "memory", "shard_count", "shards", "outbox", "expiry")}
+
+def metrics_text():
+    snapshot = status_snapshot
+    lines = []
+    for collector in (metrics.command_invocations, metrics.command_errors, metrics.command_latency,
+                      metrics.backend_latency, metrics.backend_response_bytes, metrics.backend_retries,
+                      metrics.loop_lag,
+                      metrics.command_timeouts, rate_limiter.rejected, notifier.results):
+        lines.extend(collector.collect())
+    latency = snapshot["gateway_latency"]
+    lines.extend(_sample('bot_gateway_latency_seconds', 'Discord gateway heartbeat latency',
+                         latency if latency is not None else 'NaN'))
+    lines.extend(_sample('bot_event_loop_lag_last_seconds', 'Most recent event loop lag sample',
+                         metrics.last_loop_lag))
+    lines.extend(_sample('bot_guilds', 'Guilds the bot is in', snapshot["guild_count"]))
+    memory = snapshot["memory"]
+    if memory.get("rss_bytes") is not None:
+        lines.extend(_sample('bot_process_resident_memory_bytes', 'Resident set size of the bot process',
+                             memory["rss_bytes"]))
+    for key in ('cached_members', 'cached_users', 'cached_messages'):
+        if key in memory:
+            lines.extend(_sample(f'bot_{key}', f'Discord objects held in the {key[7:-1]} cache', memory[key]))
+    lines.extend(_sample('bot_backend_up', 'Commission API circuit state (1 up, 0.5 degraded, 0 down)',
+                         {BackendHealth.UP: 1, BackendHealth.DEGRADED: 0.5}.get(snapshot["backend"]["state"], 0)))
+    cache_stats = snapshot["cache"]
+    for key in ('hits', 'misses', 'evictions', 'invalidations'):
+        lines.extend(_sample(f'bot_cache_{key}_total', f'Response cache {key}', cache_stats[key], 'counter'))
+    lines.extend(_sample('bot_cache_entries', 'Response cache entries', cache_stats['size']))
+    lines.extend(_sample('bot_coalesced_requests_total', 'GETs served by an in-flight request',
+                         snapshot["coalesced_requests"], 'counter'))
+    lines.extend(_sample('bot_admin_denials_total', 'Admin commands denied', snapshot["admin_denials"], 'counter'))
+    outbox_stats = snapshot["outbox"]
+    lines.extend(_sample('bot_outbox_pending', 'Mutations waiting in the outbox', outbox_stats['pending']))
+    lines.extend(_sample('bot_outbox_replayed_total', 'Outbox entries delivered', outbox_stats['replayed'], 'counter'))
+    lines.extend(_sample('bot_outbox_failed_total', 'Outbox entries rejected by the backend',
+                         outbox_stats['failed'], 'counter'))
+    return '\n'.join(lines) + '\n'
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+def accept_backend_events(body, signature):
+    """Verify and schedule a pushed event payload; returns (response payload, status code).
+
+    The body is signed with HMAC-SHA256 using WEBHOOK_SECRET and the hex digest
+    is sent in the X-Signature header. Events are handed to the bot's loop and
+    acknowledged without waiting for them to be processed.
+    """
+    if not WEBHOOK_SECRET:
+        return {"error": "Webhooks are not configured"}, 404
+
+    expected = hmac.new(WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+    if not hmac.compare_digest(expected, signature or ''):
+        return {"error": "Invalid signature"}, 401
+
+    try:
+        payload = json.loads(body)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return {"error": "Invalid event payload"}, 400
+    if not bot.loop.is_running():
+        return {"error": "Bot is not running"}, 503
+
+    # A batch may be sent as {"events": [...]}
+    events = payload.get('events', [payload])
+    if not isinstance(events, list) or not all(valid_event(event) for event in events):
+        return {"error": "Invalid event payload"}, 400
+    for event in events:
+        future = asyncio.run_coroutine_threadsafe(handle_backend_event(event), bot.loop)
+        future.add_done_callback(log_event_failure)
+    return {"accepted": len(events)}, 202
+
+def log_event_failure(future):
+    """Done-callback that logs an event handler's exception instead of dropping it"""
+    if not future.cancelled() and future.exception() is not None:
+        log.error("Error handling backend event: %s", future.exception(), exc_info=future.exception())
+
 # Create Flask app for web service
 web_app = Flask(__name__)
 
 @web_app.route('/')
 def health_check():
     """Health check endpoint for Render"""
-    return jsonify({
-        "status": "healthy", 
-        "bot_status": "connected" if bot.is_ready() else "connecting",
-        "timestamp": datetime.utcnow().isoformat()
-    })
+    return jsonify(health_payload())
 
 @web_app.route('/bot/status')
 def bot_status():
     """Bot status endpoint"""
-    return jsonify({
-        "bot_ready": bot.is_ready(),
-        "bot_user": str(bot.user) if bot.user else None,
-        "guild_count": len(bot.guilds) if bot.is_ready() else 0
-    })
+    return jsonify(status_payload())
+
+@web_app.route('/metrics')
+def metrics_endpoint():
+    """Prometheus text-format metrics"""
+    return metrics_text(), 200, {'Content-Type': METRICS_CONTENT_TYPE}
+
+@web_app.route('/webhooks/events', methods=['POST'])
+def backend_events():
+    """Receive commission and report events pushed by the backend"""
+    payload, status = accept_backend_events(request.get_data(), request.headers.get('X-Signature'))
+    return jsonify(payload), status
+
+# Async status server, served on the bot's own event loop
+async def health_check_async(request):
+    return web.json_response(health_payload())
+
+async def bot_status_async(request):
+    return web.json_response(status_payload())
+
+async def metrics_async(request):
+    return web.Response(body=metrics_text().encode(), headers={'Content-Type': METRICS_CONTENT_TYPE})
+
+async def backend_events_async(request):
+    payload, status = accept_backend_events(await request.read(), request.headers.get('X-Signature'))
+    return web.json_response(payload, status=status)
+
+def create_status_app():
+    app = web.Application()
+    app.router.add_get('/', health_check_async)
+    app.router.add_get('/bot/status', bot_status_async)
+    app.router.add_get('/metrics', metrics_async)
+    app.router.add_post('/webhooks/events', backend_events_async)
+    return app
+
+async def start_status_server(port):
+    runner = web.AppRunner(create_status_app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, '0.0.0.0', port).start()
+    log.info("Status server listening on port %s", port)
+    return runner
 
 def run_bot():
     """Run Discord bot in a separate thread"""
     bot_token = os.environ.get('DISCORD_BOT_TOKEN')
     if not bot_token:
-        print("Error: DISCORD_BOT_TOKEN environment variable not set")
+        log.error("DISCORD_BOT_TOKEN environment variable not set")
         return
     
     bot.run(bot_token)
@@ -653,21 +3073,180 @@ def run_bot():
 def run_web_app():
     """Run Flask web app"""
     port = int(os.environ.get('PORT', 5000))
-    print(f"Starting Flask web server on port {port}")
+    log.info("Starting Flask web server on port %s", port)
     web_app.run(host='0.0.0.0', port=port, debug=False)
 
+# Shard supervisor: runs the shard workers and serves their aggregated status
+async def recommended_shard_count(token):
+    async with aiohttp.ClientSession() as session:
+        async with session.get('https://discord.com/api/v10/gateway/bot',
+                               headers={'Authorization': f'Bot {token}'}) as response:
+            response.raise_for_status()
+            return (await response.json())['shards']
+
+class ShardSupervisor:
+    """Starts one worker process per shard group and restarts workers that exit"""
+
+    def __init__(self, shard_count, workers, port):
+        self.shard_count = shard_count
+        self.port = port
+        # Worker i runs shards i, i + workers, ... and serves its own status on port + 1 + i
+        self.groups = [list(range(i, shard_count, workers)) for i in range(min(workers, shard_count))]
+        self.processes = {}
+        self.started_at = {}
+        # Worker index -> consecutive quick exits, and when a pending restart is due
+        self.failures = {}
+        self.restart_at = {}
+        self._session = None
+
+    def worker_port(self, index):
+        return self.port + 1 + index
+
+    def spawn(self, index):
+        env = dict(os.environ,
+                   SHARD_WORKERS='1',
+                   SHARD_COUNT=str(self.shard_count),
+                   SHARD_IDS=','.join(map(str, self.groups[index])),
+                   PORT=str(self.worker_port(index)),
+                   WEB_SERVER_MODE='async',
+                   # A shared outbox would be replayed (and DM'd) by every worker
+                   OUTBOX_PATH=f'{OUTBOX_PATH}.{index}',
+                   EXPIRY_DB_PATH=f'{EXPIRY_DB_PATH}.{index}')
+        self.processes[index] = subprocess.Popen([sys.executable, os.path.abspath(__file__)], env=env)
+        self.started_at[index] = time.monotonic()
+        log.info("Started shard worker %s (pid %s) for shards %s", index, self.processes[index].pid,
+                 self.groups[index])
+
+    def restart_delay(self, index, now):
+        """Doubling delay for a worker that exited; one that outlived the cap starts over"""
+        if now - self.started_at[index] >= SHARD_RESTART_BACKOFF_MAX:
+            self.failures[index] = 0
+        delay = min(SHARD_IDENTIFY_INTERVAL * 2 ** self.failures.get(index, 0), SHARD_RESTART_BACKOFF_MAX)
+        self.failures[index] = self.failures.get(index, 0) + 1
+        return delay
+
+    async def supervise(self):
+        # Each worker identifies its own shards one interval apart, so the next
+        # worker starts once those are through instead of racing them
+        for index in range(len(self.groups)):
+            self.spawn(index)
+            if index + 1 < len(self.groups):
+                await asyncio.sleep(SHARD_IDENTIFY_INTERVAL * len(self.groups[index]))
+        while True:
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            for index, process in self.processes.items():
+                if process.poll() is None:
+                    continue
+                if index not in self.restart_at:
+                    delay = self.restart_delay(index, now)
+                    self.restart_at[index] = now + delay
+                    log.warning("Shard worker %s exited with %s, restarting in %.0fs", index, process.returncode,
+                                delay)
+                elif now >= self.restart_at[index]:
+                    del self.restart_at[index]
+                    self.spawn(index)
+
+    def stop(self):
+        for process in self.processes.values():
+            process.terminate()
+
+    async def _worker_status(self, index):
+        url = f'http://127.0.0.1:{self.worker_port(index)}/bot/status'
+        try:
+            async with self._session.get(url, timeout=aiohttp.ClientTimeout(total=2)) as response:
+                status = await response.json()
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            status = {"bot_ready": False, "guild_count": 0, "shards": []}
+        process = self.processes.get(index)
+        return {"worker": index, "pid": process.pid if process else None, "port": self.worker_port(index),
+                "shard_ids": self.groups[index], **status}
+
+    async def aggregated_status(self):
+        workers = await asyncio.gather(*(self._worker_status(index) for index in range(len(self.groups))))
+        shards = sorted((shard for worker in workers for shard in worker.get("shards", [])),
+                        key=lambda shard: shard["shard_id"])
+        return {
+            "bot_ready": all(worker.get("bot_ready") for worker in workers),
+            "guild_count": sum(worker.get("guild_count", 0) for worker in workers),
+            "shard_count": self.shard_count,
+            "shards_connected": sum(1 for shard in shards if shard["connected"]),
+            "shards": shards,
+            "workers": workers
+        }
+
+    async def health_check(self, request):
+        status = await self.aggregated_status()
+        return web.json_response({
+            "status": "healthy",
+            "bot_status": "connected" if status["bot_ready"] else "connecting",
+            "timestamp": datetime.utcnow().isoformat()
+        })
+
+    async def bot_status(self, request):
+        return web.json_response(await self.aggregated_status())
+
+    async def backend_events(self, request):
+        # Every worker keeps its own caches, so each one receives every event
+        body = await request.read()
+        headers = {'X-Signature': request.headers.get('X-Signature', ''), 'Content-Type': 'application/json'}
+        statuses = []
+        for index in range(len(self.groups)):
+            url = f'http://127.0.0.1:{self.worker_port(index)}/webhooks/events'
+            try:
+                async with self._session.post(url, data=body, headers=headers) as response:
+                    statuses.append(response.status)
+            except aiohttp.ClientError:
+                statuses.append(503)
+        status = max(statuses) if any(code >= 400 for code in statuses) else 202
+        return web.json_response({"workers": statuses}, status=status)
+
+    async def run(self):
+        self._session = aiohttp.ClientSession()
+        app = web.Application()
+        app.router.add_get('/', self.health_check)
+        app.router.add_get('/bot/status', self.bot_status)
+        app.router.add_post('/webhooks/events', self.backend_events)
+        runner = web.AppRunner(app, access_log=None)
+        await runner.setup()
+        await web.TCPSite(runner, '0.0.0.0', self.port).start()
+        log.info("Shard supervisor listening on port %s", self.port)
+        try:
+            # Stop the workers too when the platform terminates the supervisor
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:
+            pass
+        try:
+            await self.supervise()
+        finally:
+            self.stop()
+            await runner.cleanup()
+            await self._session.close()
+
+async def run_shard_supervisor(token):
+    shard_count = SHARD_COUNT or await recommended_shard_count(token)
+    await ShardSupervisor(shard_count, SHARD_WORKERS, int(os.environ.get('PORT', 5000))).run()
+
 if __name__ == '__main__':
-    print("Starting Discord Commission Bot Service...")
-    
-    # Start Discord bot in background thread
-    print("Starting Discord bot thread...")
-    bot_thread = threading.Thread(target=run_bot, daemon=True)
-    bot_thread.start()
-    
-    # Give bot a moment to start
-    import time
-    time.sleep(2)
-    
-    # Run Flask web app (keeps the service alive)
-    print("Starting Flask web server...")
-    run_web_app()
\ No newline at end of file
+    setup_logging()
+    log.info("Starting Discord Commission Bot Service...")
+
+    if SHARD_WORKERS > 1:
+        bot_token = os.environ.get('DISCORD_BOT_TOKEN')
+        if not bot_token:
+            log.error("DISCORD_BOT_TOKEN environment variable not set")
+        else:
+            asyncio.run(run_shard_supervisor(bot_token))
+    elif WEB_SERVER_MODE == 'async':
+        # Status endpoints share the bot's event loop; bot.run keeps the service alive
+        bot.status_port = int(os.environ.get('PORT', 5000))
+        run_bot()
+    else:
+        # Start Discord bot in background thread
+        log.info("Starting Discord bot thread...")
+        bot_thread = threading.Thread(target=run_bot, daemon=True)
+        bot_thread.start()
+
+        # Run Flask web app (keeps the service alive); health reports "connecting" until the bot is ready
+        log.info("Starting Flask web server...")
+        run_web_app()